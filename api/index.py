@@ -1,8 +1,10 @@
-def handler(request):
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'text/plain'},
-        'body': 'CricSmart is working! 🏏'
-    }
-
-app = handler
+# Vercel Python Entry Point
+# Exports the ASGI app; ReportLab is only imported when a PDF route is hit
+# and static assets are served by Vercel itself (see vercel.json)
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgi_app import app
@@ -0,0 +1,672 @@
+"""
+ASGI application for the Cricket Scoring Application
+Serves the /api/* routes and static files on asyncio. Blocking work
+(file reads, store reads) runs in a thread pool, scoring commands in a
+pool of their own, and ReportLab PDF builds run in a pool of worker
+processes, so an export never stalls the other scorers on the process.
+
+Run locally with: python asgi_app.py [--host HOST] [--port PORT] [--workers N]
+(requires an ASGI server such as uvicorn). With several workers, or with
+CRICSMART_SHARED=1, every process works from the shared SQLite store and
+picks up the other processes' changes; the "current match" is then per
+process, so clients should pass match_id explicitly.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from models import MatchState, Team, Player, PlayerRole, WicketType
+from match_store import create_store
+from live_feed import LiveFeed
+from match_registry import MatchRegistry, StaleVersionError
+from pdf_jobs import PDFJob, PDFJobQueue, QueueFullError
+from leaderboard import ENGINE as LEADERBOARD_ENGINE, Leaderboard, player_rows
+import http_cache
+import tracing
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# Thread pool for blocking work; sized for a few concurrent PDF exports
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cricsmart-blocking')
+# Scoring commands get their own threads: in shared mode one can wait up to
+# the store's busy timeout for another process's write lock, and that must
+# not tie up the threads reads and file serving run on
+command_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cricsmart-commands')
+
+store = create_store()
+live_feed = LiveFeed()
+# Several worker processes sharing one SQLite store
+SHARED = os.environ.get('CRICSMART_SHARED', '').lower() in ('1', 'true', 'yes', 'on')
+registry = MatchRegistry(store, live_feed, shared=SHARED)
+current_match_id: Optional[str] = None
+pdf_jobs: Optional[PDFJobQueue] = None
+static_files = http_cache.StaticCache()
+# match_id -> (version, leaderboard rows), so unchanged matches are not re-read
+_leaderboard_rows: Dict[str, Tuple[int, list]] = {}
+
+
+class Request:
+    """Minimal view of an ASGI HTTP request"""
+
+    def __init__(self, scope: Dict[str, Any], body: bytes):
+        self.scope = scope
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+        self.headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope.get('headers', [])}
+        self.body = body
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        return json.loads(self.body)
+
+
+class Response:
+    def __init__(self, body: bytes = b'', status: int = 200, content_type: str = 'application/json',
+                 headers: Optional[Dict[str, str]] = None, stream=None):
+        self.body = body
+        self.status = status
+        self.headers = {'content-type': content_type, **(headers or {})}
+        self.stream = stream  # async iterator of bytes for streaming responses
+
+    async def send(self, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        headers = dict(self.headers)
+        if self.stream is None and self.status != 304:
+            headers['content-length'] = str(len(self.body))
+        await send({
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': [(key.encode('latin-1'), value.encode('latin-1')) for key, value in headers.items()]
+        })
+        if self.stream is None:
+            await send({'type': 'http.response.body', 'body': self.body})
+            return
+        async for chunk in self.stream:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+def json_response(data: Dict[str, Any], status: int = 200) -> Response:
+    return Response(json.dumps(data).encode('utf-8'), status)
+
+
+def error_response(message: str, status: int = 400) -> Response:
+    return json_response({'success': False, 'error': message}, status)
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+ROUTES: Dict[Tuple[str, str], Handler] = {}
+
+
+def route(method: str, path: str):
+    """Register a handler for an exact method and path"""
+    def register(handler: Handler) -> Handler:
+        ROUTES[(method, path)] = handler
+        return handler
+    return register
+
+
+async def run_blocking(func, *args):
+    """Run blocking work in the shared executor"""
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def run_command(func, *args):
+    """Run a store-writing command in the command executor"""
+    return await asyncio.get_running_loop().run_in_executor(command_executor, func, *args)
+
+
+def get_match(match_id: Optional[str]) -> Optional[MatchState]:
+    """Get a live match, recovering it from the store after a restart"""
+    match_id = match_id or current_match_id
+    entry = registry.get(match_id) if match_id else None
+    return entry.match if entry else None
+
+
+def _match_id(request: Request, data: Dict[str, Any]) -> str:
+    match_id = data.get('match_id') or request.query.get('match_id') or current_match_id
+    if not match_id:
+        raise KeyError('No match selected')
+    return match_id
+
+
+async def mutate(request: Request, command: Callable[[MatchState, Dict[str, Any]], Any], log_op: Optional[str] = None,
+                 nothing: Optional[str] = None) -> Response:
+    """Run a command through the match's serialised pipeline and report the new state
+
+    The request may send the version it last saw; a stale one gets 409.
+    A logged command that changed nothing also gets 409, with the error
+    message `nothing` (when given). The command, its store writes and any
+    wait for the match or store write lock run in the command executor.
+    """
+    data = request.json()
+    match_id = _match_id(request, data)
+    expected = data.get('version')
+
+    def run() -> Tuple[Any, int, Dict[str, Any]]:
+        result, version = registry.execute(match_id, lambda match: command(match, data),
+                                           int(expected) if expected is not None else None, log_op)
+        with tracing.span('state.summary'):
+            summary = registry.read(match_id, lambda match: match.get_match_summary())
+        return result, version, summary
+    try:
+        result, version, summary = await run_command(run)
+    except StaleVersionError as e:
+        return json_response({'success': False, 'error': str(e), 'version': e.current_version}, 409)
+    if result is None and nothing:
+        return json_response({'success': False, 'error': nothing, 'version': version}, 409)
+    return json_response({'success': True, 'match_id': match_id, 'version': version, 'summary': summary})
+
+
+def _team(match: MatchState, key: Optional[str]) -> Team:
+    """Resolve a team given as 'a'/'b' or by name"""
+    for side, team in (('a', match.team_a), ('b', match.team_b)):
+        if team and key in (side, team.team_name):
+            return team
+    raise ValueError(f"Unknown team: {key}")
+
+
+def _wicket_type(value: str) -> WicketType:
+    try:
+        return WicketType(value)
+    except ValueError:
+        return WicketType[value.upper().replace(' ', '_').replace('-', '_')]
+
+
+@route('GET', '/api/status')
+async def status(request: Request) -> Response:
+    return json_response({
+        'success': True,
+        'cricket_modules': True,
+        'total_matches': len(registry.index),
+        'current_match_id': current_match_id,
+        'message': 'CricSmart is running'
+    })
+
+
+@route('POST', '/api/create-match')
+async def create_match(request: Request) -> Response:
+    global current_match_id
+    data = request.json()
+    current_match_id = await run_command(registry.create, MatchState(match_name=data.get('match_name')))
+    return json_response({'success': True, 'match_id': current_match_id, 'message': 'Match created'})
+
+
+@route('GET', '/api/matches')
+async def list_matches(request: Request) -> Response:
+    """Most recently updated matches first: ?status=live|completed&team=&limit=&cursor="""
+    query = request.query
+    page = registry.index.query(status=query.get('status') or None, team=query.get('team') or None,
+                                limit=max(1, min(int(query.get('limit', 20)), 100)),
+                                cursor=query.get('cursor') or None)
+    return json_response({
+        'success': True,
+        'matches': {header.match_id: header.to_dict() for header in page['matches']},
+        'next_cursor': page['next_cursor'],
+        'total': page['total'],
+        'current_match_id': current_match_id
+    })
+
+
+@route('POST', '/api/start')
+async def start(request: Request) -> Response:
+    """Set up teams and overs: {team_a, team_b, overs, batting_first?, match_name?}"""
+    global current_match_id
+    data = request.json()
+    if not data.get('match_id') and not request.query.get('match_id'):
+        current_match_id = await run_command(registry.create, MatchState(match_name=data.get('match_name')))
+
+    def setup(match: MatchState, data: Dict[str, Any]):
+        match.team_a = Team(data['team_a'])
+        match.team_b = Team(data['team_b'])
+        match.max_overs = int(data['overs'])
+        match.match_name = data.get('match_name') or match.match_name or f"{data['team_a']} vs {data['team_b']}"
+        batting = _team(match, data.get('batting_first', 'a'))
+        match.batting_team = batting
+        match.bowling_team = match.team_b if batting is match.team_a else match.team_a
+        match.batting_first_team_name = batting.team_name
+        match.mark_changed(structural=True)
+    return await mutate(request, setup)
+
+
+@route('POST', '/api/add_player')
+async def add_player(request: Request) -> Response:
+    """{team: 'a'|'b'|team name, name, role?}"""
+    def add(match: MatchState, data: Dict[str, Any]):
+        role = PlayerRole(data['role']) if data.get('role') else PlayerRole.BATSMAN
+        _team(match, data['team']).add_player(Player(id=str(uuid.uuid4()), name=data['name'].strip(), role=role))
+        match.mark_changed(structural=True)
+    return await mutate(request, add)
+
+
+@route('POST', '/api/edit-player')
+async def edit_player(request: Request) -> Response:
+    """{player_id, name?, role?}"""
+    def edit(match: MatchState, data: Dict[str, Any]):
+        player = match.get_player_by_id(data['player_id'])
+        if player is None:
+            raise ValueError("Player not found")
+        role = PlayerRole(data['role']) if data.get('role') else None
+        team = match.team_a if match.team_a.get_player_by_id(player.id) else match.team_b
+        if data.get('name'):
+            team.rename_player(player.id, data['name'].strip())
+        if role is not None:
+            player.role = role
+        match.mark_changed(structural=True)
+    return await mutate(request, edit)
+
+
+@route('POST', '/api/remove-player')
+async def remove_player(request: Request) -> Response:
+    """{player_id}; only players who have not batted or bowled can be removed"""
+    def remove(match: MatchState, data: Dict[str, Any]):
+        player_id = data['player_id']
+        for team in (match.team_a, match.team_b):
+            if team and team.get_player_by_id(player_id):
+                if player_id in team.batting_order or player_id in team.bowling_order:
+                    raise ValueError("Cannot remove a player who has batted or bowled")
+                team.remove_player(player_id)
+                match.mark_changed(structural=True)
+                return
+        raise ValueError("Player not found")
+    return await mutate(request, remove)
+
+
+@route('POST', '/api/set_openers')
+async def set_openers(request: Request) -> Response:
+    """{striker_id, non_striker_id, bowler_id}"""
+    return await mutate(request, lambda match, data: match.set_openers(
+        data['striker_id'], data['non_striker_id'], data['bowler_id']))
+
+
+@route('POST', '/api/set_bowler')
+async def set_bowler(request: Request) -> Response:
+    """{bowler_id}"""
+    return await mutate(request, lambda match, data: match.set_bowler(data['bowler_id']))
+
+
+@route('POST', '/api/score')
+async def score(request: Request) -> Response:
+    """{runs, comment?}"""
+    return await mutate(request, lambda match, data: match.score_ball(
+        int(data['runs']), comment=data.get('comment', '')), 'ball')
+
+
+@route('POST', '/api/extra')
+async def extra(request: Request) -> Response:
+    """{extra_type: wide|no-ball|bye|leg-bye|dead-ball, runs?, comment?}"""
+    return await mutate(request, lambda match, data: match.score_ball(
+        int(data.get('runs', 0)), extra_type=data['extra_type'], comment=data.get('comment', '')), 'ball')
+
+
+@route('POST', '/api/wicket')
+async def wicket(request: Request) -> Response:
+    """{wicket_type, catcher_id?, runout_by?, runs?, comment?}"""
+    return await mutate(request, lambda match, data: match.score_ball(
+        int(data.get('runs', 0)), wicket_type=_wicket_type(data['wicket_type']),
+        catcher_id=data.get('catcher_id'), runout_by=data.get('runout_by'),
+        comment=data.get('comment', '')), 'ball')
+
+
+@route('POST', '/api/undo')
+async def undo(request: Request) -> Response:
+    """Undo the last ball or innings switch"""
+    return await mutate(request, lambda match, data: match.undo(), 'undo', 'Nothing to undo')
+
+
+@route('POST', '/api/redo')
+async def redo(request: Request) -> Response:
+    """Redo the last undone ball or innings switch"""
+    return await mutate(request, lambda match, data: match.redo(), 'redo', 'Nothing to redo')
+
+
+@route('POST', '/api/switch_innings')
+async def switch_innings(request: Request) -> Response:
+    return await mutate(request, lambda match, data: match.switch_innings())
+
+
+@route('GET', '/api/state')
+async def state(request: Request) -> Response:
+    """Full state, or the changes after ?since=; a current If-None-Match gets an empty 304
+
+    The state carries each innings' ball count but not the balls; clients
+    page them through /api/balls.
+    """
+    match_id = _match_id(request, {})
+    since = int(request.query['since']) if 'since' in request.query else None
+    if_none_match = request.headers.get('if-none-match')
+
+    def build(match: MatchState) -> Tuple[str, Optional[Dict[str, Any]]]:
+        # The state is fully determined by the version, so the check needs no serialization
+        etag = http_cache.version_etag(match_id, match.version) if since is None else \
+            http_cache.version_etag(match_id, since, match.version)
+        if http_cache.etag_matches(if_none_match, etag):
+            return etag, None
+        if since is not None:
+            return etag, {'success': True, **match.diff(since)}
+        with tracing.span('state.build'):
+            return etag, {
+                'success': True,
+                'version': match.version,
+                'summary': match.get_match_summary(),
+                'innings': match.get_innings_summary(),
+                'snapshot': match.to_snapshot(ball_logs=False)
+            }
+    etag, data = await run_blocking(registry.read, match_id, build)
+    if data is None:
+        return not_modified(etag)
+    response = json_response(data)
+    response.headers.update({'etag': etag, 'cache-control': 'no-cache'})
+    return response
+
+
+@route('GET', '/api/balls')
+async def balls(request: Request) -> Response:
+    """Ball-by-ball history: ?after=&limit=&innings= pages by index; ?over=N returns that over and its tally"""
+    match_id = _match_id(request, {})
+    query = request.query
+    innings = int(query['innings']) if query.get('innings') else None
+    if query.get('over'):
+        over = int(query['over'])
+
+        def read_over(match: MatchState) -> Dict[str, Any]:
+            return {
+                'success': True,
+                'version': match.version,
+                'innings': innings or match.current_innings,
+                'over': over,
+                'summary': match.get_over_tallies(innings).get(over),
+                'balls': [ball.to_dict() for ball in match.iter_balls(range(over, over + 1), innings)]
+            }
+        return json_response(await run_blocking(registry.read, match_id, read_over))
+
+    after = int(query.get('after', -1))
+    limit = max(1, min(int(query.get('limit', 60)), 300))
+
+    def read_page(match: MatchState) -> Dict[str, Any]:
+        return {'success': True, 'version': match.version, **match.get_balls_page(after, limit, innings)}
+    return json_response(await run_blocking(registry.read, match_id, read_page))
+
+
+@route('GET', '/api/overs')
+async def overs(request: Request) -> Response:
+    """Per-over runs/wickets/balls of an innings: ?innings= (default current)"""
+    match_id = _match_id(request, {})
+    innings = int(request.query['innings']) if request.query.get('innings') else None
+
+    def read(match: MatchState) -> Dict[str, Any]:
+        tallies = match.get_over_tallies(innings)
+        return {
+            'success': True,
+            'version': match.version,
+            'innings': innings or match.current_innings,
+            'overs': [{'over': over, **tally} for over, tally in sorted(tallies.items())]
+        }
+    return json_response(await run_blocking(registry.read, match_id, read))
+
+
+@route('GET', '/api/stream')
+async def stream(request: Request) -> Response:
+    match_id = _match_id(request, {})
+    if await run_blocking(get_match, match_id) is None:
+        return error_response('Match not found', 404)
+    last_event_id = request.headers.get('last-event-id')
+
+    def read(reader):
+        try:
+            return registry.read(match_id, reader)
+        except KeyError:
+            return None  # deleted meanwhile
+    events = live_feed.stream_async(match_id, read, int(last_event_id) if last_event_id else None)
+    return Response(content_type='text/event-stream', headers={'cache-control': 'no-cache'}, stream=events)
+
+
+def _match_rows(match_id: str) -> Optional[Tuple[int, list]]:
+    """(version, leaderboard rows) of a match, without loading it into the registry"""
+    if registry.loaded(match_id):
+        return registry.read(match_id, lambda match: (match.version, player_rows(match)))
+    match = store.load(match_id)
+    return (match.version, player_rows(match)) if match is not None else None
+
+
+def build_tournament_leaderboard() -> Leaderboard:
+    """Leaderboard over every match in the listing index
+
+    Rows are cached per match and only rebuilt when the match's header
+    shows a new version; archived matches are read straight from the store.
+    """
+    headers = registry.index.headers()
+    rows = []
+    for header in headers:
+        cached = _leaderboard_rows.get(header.match_id)
+        if cached is None or cached[0] < header.version:
+            try:
+                cached = _match_rows(header.match_id)
+            except KeyError:
+                cached = None
+            if cached is None:
+                continue  # deleted meanwhile
+            _leaderboard_rows[header.match_id] = cached
+        rows.extend(cached[1])
+    for match_id in set(_leaderboard_rows) - {header.match_id for header in headers}:
+        _leaderboard_rows.pop(match_id, None)
+    return Leaderboard(rows)
+
+
+@route('GET', '/api/leaderboard')
+async def tournament_leaderboard(request: Request) -> Response:
+    """Top players across all matches: ?metric=runs&limit=10&min= (min overrides the qualifier)"""
+    metric = request.query.get('metric', 'runs')
+    limit = min(int(request.query.get('limit', 10)), 100)
+    minimum = int(request.query['min']) if request.query.get('min') else None
+    with tracing.span('leaderboard.build'):
+        board = await run_blocking(build_tournament_leaderboard)
+    return json_response({
+        'success': True,
+        'metric': metric,
+        'engine': LEADERBOARD_ENGINE,
+        'total_players': board.size,
+        'players': board.top(metric, limit, minimum)
+    })
+
+
+def pdf_queue() -> PDFJobQueue:
+    """The export queue, created on the first PDF request"""
+    global pdf_jobs
+    if pdf_jobs is None:
+        # Imported here so ReportLab is only loaded when a PDF is requested
+        from pdf_generator import pdf_cache
+        pdf_jobs = PDFJobQueue(cache=pdf_cache)
+    return pdf_jobs
+
+
+def submit_pdf_job(match_id: str) -> PDFJob:
+    # Copy the state under the match lock; the worker renders from the copy
+    snapshot = registry.read(match_id, lambda match: match.to_snapshot())
+    return pdf_queue().submit(match_id, snapshot)
+
+
+def pdf_response(pdf: bytes) -> Response:
+    filename = f"cricket_scoreboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return Response(pdf, content_type='application/pdf',
+                    headers={'content-disposition': f'attachment; filename="{filename}"'})
+
+
+@route('GET', '/api/generate-pdf')
+@route('POST', '/api/generate-pdf')
+async def generate_pdf(request: Request) -> Response:
+    """Export and wait for the PDF (use /api/pdf-jobs to export in the background)"""
+    queue = pdf_queue()
+    match_id = _match_id(request, request.json() if request.method == 'POST' else {})
+    version = await run_blocking(registry.read, match_id, lambda match: match.version)
+    pdf = queue.cache.get((match_id, version))
+    if pdf is None:
+        job = await queue.wait_async((await run_blocking(submit_pdf_job, match_id)).job_id)
+        pdf = job.result()
+    return pdf_response(pdf)
+
+
+@route('POST', '/api/pdf-jobs')
+async def create_pdf_job(request: Request) -> Response:
+    """Start a background export of the match's current version: {match_id?}"""
+    job = await run_blocking(submit_pdf_job, _match_id(request, request.json()))
+    return json_response({'success': True, 'job': job.to_dict()}, 200 if job.status == 'done' else 202)
+
+
+def _pdf_job(request: Request) -> PDFJob:
+    job = pdf_queue().get(request.query.get('job_id', ''))
+    if job is None:
+        raise KeyError('Job not found')
+    return job
+
+
+@route('GET', '/api/pdf-jobs')
+async def pdf_job_status(request: Request) -> Response:
+    """Poll a job: ?job_id=&wait=seconds (wait blocks until it finishes, up to that long)"""
+    job = _pdf_job(request)
+    if request.query.get('wait'):
+        await pdf_queue().wait_async(job.job_id, min(float(request.query['wait']), 60.0))
+    return json_response({'success': True, 'job': job.to_dict()})
+
+
+@route('GET', '/api/pdf-jobs/result')
+async def pdf_job_result(request: Request) -> Response:
+    """Download a finished job's PDF: ?job_id="""
+    job = _pdf_job(request)
+    status = job.status
+    if status == 'failed':
+        return error_response(f"PDF export failed: {job.future.exception()}", 500)
+    if status != 'done':
+        return json_response({'success': False, 'error': 'PDF is not ready yet', 'job': job.to_dict()}, 409)
+    return pdf_response(job.result())
+
+
+@route('GET', '/api/metrics')
+async def metrics(request: Request) -> Response:
+    """Latency histograms per route and span (collected when CRICSMART_TRACING=1)"""
+    data = {'success': True, 'tracing': tracing.enabled(), 'spans': tracing.snapshot()}
+    if pdf_jobs is not None:
+        data['pdf'] = {
+            'jobs_pending': pdf_jobs.pending,
+            'cache_hits': pdf_jobs.cache.hits,
+            'cache_misses': pdf_jobs.cache.misses,
+            'cache_bytes': pdf_jobs.cache.size
+        }
+    return json_response(data)
+
+
+async def serve_static(request: Request) -> Response:
+    """Serve files from static/ ("/" maps to index.html), compressed and revalidated from memory"""
+    name = request.path.lstrip('/') or 'index.html'
+    if name.startswith('static/'):
+        name = name[len('static/'):]
+    path = os.path.normpath(os.path.join(STATIC_DIR, name))
+    if not path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(path):
+        return error_response('Not found', 404)
+    if path.endswith('.gz') and os.path.isfile(path[:-len('.gz')]):
+        # precompress.py's copies are only sent through Accept-Encoding negotiation
+        return error_response('Not found', 404)
+    asset = await run_blocking(static_files.get, path)
+    if asset is None:
+        return error_response('Not found', 404)
+    body, encoding, etag = asset.select(request.headers.get('accept-encoding'))
+    headers = {'etag': etag, 'cache-control': 'no-cache', 'vary': 'accept-encoding'}
+    if http_cache.etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status=304, content_type=asset.content_type, headers=headers)
+    if encoding:
+        headers['content-encoding'] = encoding
+    return Response(body, content_type=asset.content_type, headers=headers)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status=304, headers={'etag': etag, 'cache-control': 'no-cache'})
+
+
+async def _read_body(receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if SHARED:
+                    registry.start_watcher()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                registry.stop_watcher()
+                executor.shutdown(wait=False)
+                command_executor.shutdown(wait=False)
+                if pdf_jobs is not None:
+                    pdf_jobs.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    request = Request(scope, await _read_body(receive))
+    handler = ROUTES.get((request.method, request.path))
+    try:
+        if handler is not None:
+            with tracing.span(f"{request.method} {request.path}"):
+                response = await handler(request)
+        elif request.method == 'GET' and not request.path.startswith('/api/'):
+            with tracing.span('GET static'):
+                response = await serve_static(request)
+        else:
+            response = error_response('Not found', 404)
+    except QueueFullError as e:
+        response = error_response(str(e), 503)
+        response.headers['retry-after'] = '5'
+    except KeyError as e:
+        response = error_response(str(e).strip("'"), 404 if 'not found' in str(e) else 400)
+    except (ValueError, TypeError) as e:
+        response = error_response(str(e))
+    except Exception as e:
+        response = error_response(f'Internal error: {e}', 500)
+    if response.stream is None and 'content-encoding' not in response.headers:
+        response.body, encoding = http_cache.encode_body(response.body, response.headers['content-type'],
+                                                         request.headers.get('accept-encoding'))
+        if encoding:
+            response.headers['content-encoding'] = encoding
+            response.headers['vary'] = 'accept-encoding'
+    await response.send(send)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the CricSmart ASGI app')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes sharing the SQLite store (default 1)')
+    args = parser.parse_args()
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("An ASGI server is required: pip install uvicorn")
+    if args.workers > 1:
+        # Workers import the app themselves, so the setting travels by environment
+        os.environ['CRICSMART_SHARED'] = '1'
+        uvicorn.run('asgi_app:app', host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Concurrency benchmark for the ASGI app
+Drives asgi_app.app in-process with 200 concurrent scorers, each scoring
+its own live match: they POST /api/score, poll /api/state and now and then
+export a PDF of the version they have just scored (so it is never cached).
+Matches are kept in a SQLite store in a temporary directory, so every
+command does real store writes. Reports requests/s and p99 latency with
+blocking work offloaded to the executor versus run inline on the event
+loop (the one-request-at-a-time behaviour), plus the p99 delay of a
+/api/status probe sent every few milliseconds, measured from when it was
+due: how long a light request waits while the scorers are busy
+Usage: python benchmarks/bench_asgi.py [scorers] [requests_per_scorer]
+"""
+
+import asyncio
+import importlib.util
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('CRICSMART_STORE', 'sqlite')
+os.environ.setdefault('CRICSMART_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='cricsmart-bench-'), 'matches.db'))
+
+import asgi_app
+from synthetic import new_match
+
+PDF_EVERY = 25  # every Nth request from a scorer is a PDF export
+PROBE_INTERVAL = 0.005
+OVERS = 50  # long enough that no innings finishes during a run
+HAS_REPORTLAB = importlib.util.find_spec('reportlab') is not None
+
+
+async def call(method, path, query=b'', body=None):
+    """Send one request through the ASGI app and return (status, seconds)"""
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'headers': []}
+    payload = json.dumps(body).encode() if body is not None else b''
+    status = {}
+
+    async def receive():
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status['code'] = message['status']
+
+    started = time.perf_counter()
+    await asgi_app.app(scope, receive, send)
+    return status['code'], time.perf_counter() - started
+
+
+async def scorer(index, requests, latencies, statuses, match_id):
+    query = f"match_id={match_id}".encode()
+    for i in range(requests):
+        if HAS_REPORTLAB and i % PDF_EVERY == index % PDF_EVERY:
+            status, seconds = await call('GET', '/api/generate-pdf', query)
+        elif i % 2 == 0:
+            status, seconds = await call('POST', '/api/score', body={'match_id': match_id, 'runs': i % 3})
+        else:
+            status, seconds = await call('GET', '/api/state', query)
+        latencies.append(seconds)
+        statuses[status] += 1
+
+
+async def probe(delays, done):
+    """Send /api/status every PROBE_INTERVAL, recording each one's delay from when it was due"""
+    due = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        await call('GET', '/api/status')
+        now = time.perf_counter()
+        delays.append(now - due)
+        due = now + PROBE_INTERVAL
+
+
+async def run(mode, scorers, requests):
+    match_ids = [f'bench-{mode}-{i}' for i in range(scorers)]
+    for match_id in match_ids:
+        asgi_app.registry.create(new_match(OVERS, name=match_id), match_id)
+    latencies = []
+    statuses = Counter()
+    delays = []
+    done = asyncio.Event()
+    prober = asyncio.create_task(probe(delays, done))
+    started = time.perf_counter()
+    await asyncio.gather(*(scorer(i, requests, latencies, statuses, match_id)
+                           for i, match_id in enumerate(match_ids)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    return {'rps': len(latencies) / elapsed, 'p99_ms': p99(latencies) * 1000,
+            'probe_p99_ms': p99(delays) * 1000, 'statuses': dict(statuses)}
+
+
+def p99(samples):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, math.ceil(len(samples) * 0.99) - 1)]
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+def main():
+    scorers = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    if not HAS_REPORTLAB:
+        print("reportlab is not installed: measuring scoring and /api/state only")
+    offloaded = asgi_app.run_blocking, asgi_app.run_command
+    results = {}
+    for mode in ('inline', 'executor'):
+        asgi_app.run_blocking, asgi_app.run_command = (run_inline, run_inline) if mode == 'inline' else offloaded
+        results[mode] = result = asyncio.run(run(mode, scorers, requests))
+        print(f"{mode:>9}: {result['rps']:8.0f} req/s   p99 {result['p99_ms']:8.2f} ms   "
+              f"probe p99 {result['probe_p99_ms']:8.2f} ms   statuses {result['statuses']}")
+    asgi_app.run_blocking, asgi_app.run_command = offloaded
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Tournament booklet benchmark
+Stores N synthetic 20-over matches in a temporary SQLite store and exports
+them as one booklet PDF
+Usage: python benchmarks/bench_booklet.py [matches]
+"""
+
+import os
+import sys
+import tempfile
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import play_match
+from match_store import SQLiteMatchStore
+from pdf_booklet import export_booklet
+
+
+def main():
+    try:
+        import reportlab  # noqa: F401
+    except ImportError as e:
+        raise SystemExit(f"reportlab is required for this benchmark ({e})")
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workdir = tempfile.mkdtemp(prefix='cricsmart-booklet-')
+    store = SQLiteMatchStore(os.path.join(workdir, 'matches.db'))
+    for i in range(count):
+        store.save(f"match-{i}", play_match(20, seed=i))
+
+    result = export_booklet(store, os.path.join(workdir, 'booklet.pdf'))
+    print(f"{result['matches']} matches in {result['seconds']}s "
+          f"({result['matches_per_second']} matches/s, {result['bytes'] / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Memory benchmark for the ball event log
+Compares a plain list of BallEvent dataclasses with the columnar BallEventLog
+Usage: python benchmarks/bench_event_memory.py
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import BallEvent, BallEventLog, WicketType
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_events(count, seed=42):
+    """Generate deliveries the way request handlers create them (fresh strings per ball)"""
+    rng = random.Random(seed)
+    player_ids = [f"player-{i:02d}" for i in range(22)]
+    events = []
+    for i in range(count):
+        runs = rng.choice([0, 0, 0, 1, 1, 1, 2, 4, 6])
+        is_wicket = rng.random() < 0.04
+        extra = rng.choice([None] * 18 + ["wide", "no-ball"])
+        events.append(BallEvent(
+            ball_number=i % 6 + 1,
+            over_number=i // 6,
+            runs=runs,
+            is_wicket=is_wicket,
+            wicket_type=rng.choice(list(WicketType)) if is_wicket else None,
+            # Copy the IDs so each event owns its strings, as after JSON decoding
+            batsman_id="".join(rng.choice(player_ids[:11])),
+            bowler_id="".join(rng.choice(player_ids[11:])),
+            extra_type=extra,
+            description=f"{runs} runs" if runs else ""
+        ))
+    return events
+
+
+def measure(build):
+    """Return (result, bytes allocated by build())"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    print(f"{'balls':>8} {'list (KiB)':>12} {'log (KiB)':>12} {'ratio':>7}")
+    for size in SIZES:
+        events, list_bytes = measure(lambda: make_events(size))
+        del events
+        _, log_bytes = measure(lambda: BallEventLog(make_events(size)))
+        print(f"{size:>8} {list_bytes / 1024:>12.1f} {log_bytes / 1024:>12.1f} {list_bytes / log_bytes:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
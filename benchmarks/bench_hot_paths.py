@@ -0,0 +1,155 @@
+"""
+Micro-benchmarks of the models and pdf_generator hot paths
+Times each path on the same seeded 20, 50 and 100-over matches from
+synthetic.py, pytest-benchmark style: every case is calibrated to run
+long enough per round, repeated for several rounds, and reported as
+min/median/mean/stddev per call. Results can be saved as JSON and compared
+with an earlier run, so an optimisation shows up as a measured ratio.
+(Named bench_*.py, so pytest does not collect it.)
+Usage: python benchmarks/bench_hot_paths.py [--filter TEXT] [--rounds N] [--json PATH] [--compare PATH]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import play_match
+
+# Overs -> squad size, large enough that the longer formats are not all out early
+OVERS = {20: 11, 50: 16, 100: 22}
+SEED = 7
+ROUNDS = 7
+# Calibrate iterations so one round takes at least this long
+MIN_ROUND_SECONDS = 0.02
+HAS_REPORTLAB = importlib.util.find_spec('reportlab') is not None
+
+
+def undo_and_redo(match):
+    event = match.undo_last_event()
+    match.add_event(event)
+
+
+def undo_then_redo(match):
+    match.undo()
+    match.redo()
+
+
+def dismissals(match):
+    for team in (match.team_a, match.team_b):
+        for player in team.players:
+            match.get_player_dismissal(player.id)
+
+
+def match_result_cold(match):
+    match._result_cache = match._status_cache = None
+    match.get_match_result()
+
+
+def top_batsmen(match):
+    match.team_a.get_top_batsmen(5)
+    match.team_b.get_top_batsmen(5)
+
+
+def make_pdf(output_path):
+    from pdf_generator import CricketScoreboardPDF
+    generator = CricketScoreboardPDF()
+
+    def build(match):
+        generator.generate_scoreboard_pdf({'match': match, 'match_name': match.match_name}, output_path)
+    return build
+
+
+def cases(output_path):
+    """(name, function of the match) for every benchmarked path"""
+    found = [
+        ('add_event+undo_last_event', undo_and_redo),
+        ('undo+redo', undo_then_redo),
+        ('get_innings_summary', lambda match: match.get_innings_summary()),
+        ('get_player_dismissal (all)', dismissals),
+        ('get_match_result', lambda match: match.get_match_result()),
+        ('get_match_result (uncached)', match_result_cold),
+        ('get_ball_by_ball', lambda match: match.get_ball_by_ball()),
+        ('Team.get_top_batsmen', top_batsmen),
+    ]
+    if HAS_REPORTLAB:
+        found.append(('generate_scoreboard_pdf', make_pdf(output_path)))
+    return found
+
+
+def measure(func, match, rounds):
+    """Per-call seconds of each round, after calibrating the iterations per round"""
+    func(match)  # warm-up
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func(match)
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_ROUND_SECONDS:
+            break
+        iterations = max(iterations * 2, int(iterations * MIN_ROUND_SECONDS / max(elapsed, 1e-9)) + 1)
+    samples = [elapsed / iterations]
+    for _ in range(rounds - 1):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func(match)
+        samples.append((time.perf_counter() - started) / iterations)
+    return samples, iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the scoring and PDF hot paths')
+    parser.add_argument('--filter', default='', help='only cases whose name contains this text')
+    parser.add_argument('--rounds', type=int, default=ROUNDS)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='earlier --json results to compare medians against')
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {(r['case'], r['overs']): r for r in json.load(f)['results']}
+
+    output_path = os.path.join(tempfile.mkdtemp(prefix='cricsmart-bench-'), 'scoreboard.pdf')
+    matches = {overs: play_match(overs, seed=SEED, players=players) for overs, players in OVERS.items()}
+    results = []
+    print(f"{'case':<30} {'overs':>5} {'balls':>6} {'min us':>10} {'median us':>10} {'mean us':>10} {'stddev':>8}")
+    for name, func in cases(output_path):
+        if args.filter not in name:
+            continue
+        for overs, match in matches.items():
+            balls = len(match.events) + sum(len(log) for log in match.innings_events.values())
+            samples, iterations = measure(func, match, args.rounds)
+            result = {
+                'case': name, 'overs': overs, 'balls': balls, 'iterations': iterations, 'rounds': args.rounds,
+                'min_us': min(samples) * 1e6, 'median_us': statistics.median(samples) * 1e6,
+                'mean_us': statistics.mean(samples) * 1e6,
+                'stddev_us': statistics.stdev(samples) * 1e6 if len(samples) > 1 else 0.0
+            }
+            results.append(result)
+            line = (f"{name:<30} {overs:>5} {balls:>6} {result['min_us']:>10.1f} {result['median_us']:>10.1f} "
+                    f"{result['mean_us']:>10.1f} {result['stddev_us']:>8.1f}")
+            old = previous.get((name, overs))
+            if old:
+                line += f"  x{old['median_us'] / result['median_us']:.2f} vs before"
+            print(line)
+    if not HAS_REPORTLAB:
+        print("(generate_scoreboard_pdf skipped: ReportLab is not installed)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'seed': SEED, 'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Cold start import-time budget
+Imports the serverless entry point (api/index.py -> asgi_app) in fresh
+interpreters with `python -X importtime`, reports the slowest modules and
+fails if the best run exceeds the budget or if a module that should only
+load on demand (ReportLab, Pillow, NumPy, multiprocessing) was imported.
+Usage: python benchmarks/bench_import_time.py [budget_ms] [runs]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 250
+RUNS = 5
+# Only needed by PDF exports, leaderboards or the PDF worker pool
+LAZY_MODULES = ('reportlab', 'PIL', 'numpy', 'multiprocessing', 'concurrent.futures.process', 'pdf_generator')
+
+
+def import_times():
+    """Cumulative import time (us) per module of one cold import of the entry point"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import api.index'],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, 'CRICSMART_STORE': 'memory'}
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Import failed:\n{result.stderr}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+    best = min((import_times() for _ in range(runs)), key=lambda times: times['api.index'])
+    total_ms = best['api.index'] / 1000
+
+    print(f"{'module':<32} {'cumulative ms':>14}")
+    for name, us in sorted(best.items(), key=lambda item: -item[1])[:15]:
+        print(f"{name:<32} {us / 1000:>14.1f}")
+
+    eager = sorted(name for name in best if name.split('.')[0] in LAZY_MODULES or name in LAZY_MODULES)
+    failed = False
+    if eager:
+        print(f"\nImported at startup but should load on demand: {', '.join(eager)}")
+        failed = True
+    print(f"\nEntry point import: {total_ms:.1f} ms (budget {budget_ms:.0f} ms, best of {runs})")
+    if total_ms > budget_ms:
+        print("Over budget")
+        failed = True
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
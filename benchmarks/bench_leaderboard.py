@@ -0,0 +1,59 @@
+"""
+Leaderboard benchmark at tournament scale
+Aggregates 10,000 players over 20 appearances each and ranks every metric,
+against the per-call full sort the team helpers used before
+Usage: python benchmarks/bench_leaderboard.py [players] [appearances]
+"""
+
+import os
+import random
+import sys
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import ENGINE, Leaderboard, METRICS
+
+
+def make_rows(players, appearances, seed=42):
+    """Per-match player rows with plausible T20 figures"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(appearances):
+        for i in range(players):
+            balls = rng.randint(0, 50)
+            runs = int(balls * rng.uniform(0.6, 1.8))
+            bowling_balls = rng.choice([0, 0, 12, 18, 24])
+            wickets = rng.choice([0, 0, 0, 1, 1, 2, 3]) if bowling_balls else 0
+            conceded = int(bowling_balls * rng.uniform(0.9, 1.7))
+            rows.append((f"player {i}", f"Player {i}", f"Team {i % 64}", 1, int(balls > 0), rng.random() < 0.7,
+                         runs, balls, runs // 10, runs // 25, bowling_balls, conceded, wickets,
+                         runs + wickets * 20 + conceded // 10))
+    return rows
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    appearances = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rows = make_rows(players, appearances)
+    print(f"engine: {ENGINE}, {players} players, {len(rows)} rows")
+
+    started = time.perf_counter()
+    board = Leaderboard(rows)
+    print(f"aggregate:            {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    for metric in METRICS:
+        board.top(metric, 10)
+    print(f"top-10, all metrics:  {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    everyone = [board.player(i) for i in range(board.size)]
+    for metric, (descending, _, _) in METRICS.items():
+        sorted(everyone, key=lambda p: p[metric], reverse=descending)[:10]
+    print(f"full sort, all metrics: {(time.perf_counter() - started) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
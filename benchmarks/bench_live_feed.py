@@ -0,0 +1,78 @@
+"""
+Spectator load test: SSE push versus /api/state polling
+Runs M spectator threads on one match while a scorer plays B balls, and
+reports process CPU time per spectator for each delivery model
+Usage: python benchmarks/bench_live_feed.py [spectators] [balls]
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from live_feed import LiveFeed
+from synthetic import new_match, random_ball
+from bench_state_payload import full_state
+
+
+def run_push(spectators, balls):
+    """Every spectator holds an open stream; the scorer publishes once per ball"""
+    rng = random.Random(1)
+    match = new_match(50)
+    feed = LiveFeed()
+    received = [0] * spectators
+
+    def spectator(index):
+        for chunk in feed.stream("bench", lambda reader: reader(match), heartbeat=60):
+            if chunk.startswith(b"id:"):
+                received[index] += 1
+
+    threads = [threading.Thread(target=spectator, args=(i,), daemon=True) for i in range(spectators)]
+    for thread in threads:
+        thread.start()
+    while feed.subscriber_count("bench") < spectators:
+        time.sleep(0.01)
+    time.sleep(0.2)
+
+    started = time.process_time()
+    for _ in range(balls):
+        random_ball(match, rng)
+        feed.publish("bench", match)
+        time.sleep(0.002)
+    # Let the last frame reach everyone before stopping the clock
+    while min(received) < balls + 1:
+        time.sleep(0.01)
+    cpu = time.process_time() - started
+    feed.close("bench")
+    return cpu
+
+
+def run_polling(spectators, balls):
+    """Every spectator fetches the full state once per ball (the most forgiving polling rate)"""
+    rng = random.Random(1)
+    match = new_match(50)
+    started = time.process_time()
+    for _ in range(balls):
+        random_ball(match, rng)
+        for _ in range(spectators):
+            json.dumps(full_state(match)).encode('utf-8')
+    return time.process_time() - started
+
+
+def main():
+    spectators = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    balls = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    for name, run in (('polling', run_polling), ('push', run_push)):
+        cpu = run(spectators, balls)
+        print(f"{name:>8}: {spectators} spectators x {balls} balls, "
+              f"{cpu:.2f}s CPU, {cpu / spectators * 1000:.2f} ms CPU per spectator")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Match listing benchmark
+Times one page of /api/matches-style listing from the MatchIndex against
+building the full listing from every match, at growing archive sizes
+Usage: python benchmarks/bench_match_index.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_index import MatchHeader, MatchIndex
+
+SIZES = [1_000, 10_000, 50_000]
+
+
+def make_headers(count):
+    start = datetime(2025, 1, 1)
+    return [MatchHeader(
+        match_id=f"match-{i}", match_name=f"Match {i}", team_a=f"Team {i % 40}", team_b=f"Team {(i + 7) % 40}",
+        innings=2, runs=150, wickets=6, overs="20.0", status='completed' if i % 10 else 'live', version=300,
+        created_at=(start + timedelta(minutes=i)).isoformat(), updated_at=(start + timedelta(minutes=i)).isoformat()
+    ) for i in range(count)]
+
+
+def main():
+    print(f"{'matches':>10} {'full listing ms':>16} {'index page ms':>14} {'filtered page ms':>17}")
+    for size in SIZES:
+        headers = make_headers(size)
+        index = MatchIndex()
+        for header in headers:
+            index.update(header)
+
+        started = time.perf_counter()
+        listing = sorted((header.to_dict() for header in headers), key=lambda h: h['updated_at'], reverse=True)[:20]
+        full_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for _ in range(100):
+            [header.to_dict() for header in index.query(limit=20)['matches']]
+        page_ms = (time.perf_counter() - started) * 10
+
+        started = time.perf_counter()
+        for _ in range(100):
+            [header.to_dict() for header in index.query(status='live', team='Team 3', limit=20)['matches']]
+        filtered_ms = (time.perf_counter() - started) * 10
+
+        assert [h['match_id'] for h in listing] == [h.match_id for h in index.query(limit=20)['matches']]
+        print(f"{size:>10} {full_ms:>16.2f} {page_ms:>14.3f} {filtered_ms:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
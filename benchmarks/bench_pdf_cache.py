@@ -0,0 +1,60 @@
+"""
+PDF export benchmark: cold builds versus cache hits
+Renders a 40-over, 22-player match with the original per-request path
+(fresh generator, temp file, re-read), an in-memory build with shared
+styles, and a PDFCache hit for the same match version
+Usage: python benchmarks/bench_pdf_cache.py
+"""
+
+import os
+import sys
+import time
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import play_match
+
+REPEATS = 10
+
+
+def timed(func):
+    """Milliseconds per call, averaged over REPEATS"""
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def main():
+    try:
+        from pdf_generator import generate_scoreboard_pdf, generate_scoreboard_pdf_bytes, PDFCache
+    except ImportError as e:
+        raise SystemExit(f"reportlab is required for this benchmark ({e})")
+
+    match = play_match(40, seed=7)
+    match_data = {'match': match, 'match_name': match.match_name}
+
+    def temp_file_build():
+        path = generate_scoreboard_pdf(match_data)
+        with open(path, 'rb') as f:
+            f.read()
+        os.remove(path)
+
+    cache = PDFCache()
+    key = ('bench', match.version)
+
+    def cold_build():
+        cache.put(key, cache.get(('bench', -1)) or generate_scoreboard_pdf_bytes(match_data))
+
+    cold_cache = timed(cold_build)
+
+    print(f"temp file build:     {timed(temp_file_build):8.2f} ms")
+    print(f"in-memory build:     {timed(lambda: generate_scoreboard_pdf_bytes(match_data)):8.2f} ms")
+    print(f"cache miss (cold):   {cold_cache:8.2f} ms")
+    print(f"cache hit (warm):    {timed(lambda: cache.get(key)):8.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Replay benchmark: full rebuild versus checkpointed random access
+Replays a 50-over match, then times restoring the state before the last
+ball (an undo) and at the start of random overs
+Usage: python benchmarks/bench_replay.py
+"""
+
+import os
+import random
+import sys
+import time
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import play_match
+from replay import MatchReplay, verify
+
+
+def timed(func, repeats=20):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    match = play_match(50, seed=3)
+    balls = sum(len(log) for log in MatchReplay(match).logs.values())
+    print(f"50-over match, {balls} balls")
+    print(f"verify (full replay):      {timed(lambda: verify(match), 5):8.2f} ms")
+
+    replay = MatchReplay(match)
+    replay.final_state()  # lays down the checkpoints
+    last = len(replay.logs[2])
+    rng = random.Random(1)
+    print(f"state before last ball:    {timed(lambda: replay.state_at(2, last - 1)):8.2f} ms")
+    print(f"jump to a random over:     {timed(lambda: replay.state_at_over(rng.choice([1, 2]), rng.randrange(50))):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Payload benchmark for state polling
+Compares a full state JSON with ball-by-ball history, a MatchState
+snapshot, the snapshot clients get (no ball logs) and a per-ball diff:
+size and encode time
+Usage: python benchmarks/bench_state_payload.py
+"""
+
+import json
+import os
+import random
+import sys
+import timeit
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import new_match, random_ball, innings_over
+
+REPEATS = 200
+
+
+def full_state(match):
+    """Approximation of the /api/state payload: summaries, both rosters and ball-by-ball"""
+    return {
+        'match': match.get_match_summary(),
+        'innings': match.get_innings_summary(),
+        'first_innings': match.first_innings_summary,
+        'team_a': [player.to_dict() for player in match.team_a.players],
+        'team_b': [player.to_dict() for player in match.team_b.players],
+        'balls': match.get_ball_by_ball()
+    }
+
+
+def timed(build):
+    """Return (encoded size in bytes, microseconds per build+encode)"""
+    size = len(json.dumps(build()))
+    seconds = timeit.timeit(lambda: json.dumps(build()), number=REPEATS) / REPEATS
+    return size, seconds * 1e6
+
+
+def main():
+    print(f"{'overs':>5} {'payload':>10} {'bytes':>9} {'encode (us)':>12}")
+    for overs in (20, 50):
+        rng = random.Random(overs)
+        match = new_match(overs)
+        last_seen = match.version
+        # Play the first innings through; the diff covers its final ball
+        while not innings_over(match):
+            last_seen = match.version
+            random_ball(match, rng)
+        for name, build in (('full', lambda: full_state(match)),
+                            ('snapshot', match.to_snapshot),
+                            ('client', lambda: match.to_snapshot(ball_logs=False)),
+                            ('diff', lambda: match.diff(last_seen))):
+            size, micros = timed(build)
+            print(f"{overs:>5} {name:>10} {size:>9} {micros:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
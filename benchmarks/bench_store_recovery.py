@@ -0,0 +1,62 @@
+"""
+Recovery benchmark for the match store
+Plays a 50-over match through SQLiteMatchStore (one log record per ball,
+snapshot per innings) and times how long load() takes to recover it
+Usage: python benchmarks/bench_store_recovery.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from match_store import SQLiteMatchStore
+from synthetic import new_match, random_ball, innings_over, start_innings
+
+OVERS = 50
+REPEATS = 20
+
+
+def record_match(store, match_id, seed=0):
+    """Play a match, persisting it the way the scoring handlers do; returns (match, seconds per ball)"""
+    rng = random.Random(seed)
+    match = new_match(OVERS)
+    store.save(match_id, match)
+    balls = 0
+    started = time.perf_counter()
+    for innings in (1, 2):
+        while not innings_over(match):
+            event = random_ball(match, rng)
+            store.record(match_id, match, 'ball', event)
+            balls += 1
+        if innings == 1:
+            match.switch_innings()
+            start_innings(match)
+            store.save(match_id, match)
+    return match, (time.perf_counter() - started) / balls
+
+
+def main():
+    print(f"{'snapshot every':>15} {'write/ball (ms)':>16} {'recovery (ms)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for snapshot_every in (10, 60, 300, 10_000):
+            store = SQLiteMatchStore(os.path.join(tmp, f"bench_{snapshot_every}.db"), snapshot_every=snapshot_every)
+            match, per_ball = record_match(store, "bench")
+            recovered = SQLiteMatchStore(store.path, snapshot_every=snapshot_every)
+            started = time.perf_counter()
+            for _ in range(REPEATS):
+                loaded = recovered.load("bench")
+            recovery = (time.perf_counter() - started) / REPEATS
+            assert loaded.to_snapshot() == match.to_snapshot()
+            print(f"{snapshot_every:>15} {per_ball * 1000:>16.3f} {recovery * 1000:>14.2f}")
+            store.close()
+            recovered.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Multi-process scaling benchmark
+Runs 1, 2, 4 and 8 worker processes against one SQLite store, each with a
+shared-mode MatchRegistry as `asgi_app.py --workers N` would. Every worker
+scores its own matches, reads the other workers' matches now and then and
+also scores one match that all workers contend for. Reports scoring
+throughput and latency, then checks that every stored match replays
+cleanly and that no ball was lost.
+Usage: python benchmarks/bench_workers.py [balls_per_worker]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from match_registry import MatchRegistry
+from match_store import SQLiteMatchStore
+from replay import verify
+from synthetic import new_match, random_ball, innings_over
+
+WORKERS = [1, 2, 4, 8]
+MATCHES_PER_WORKER = 2
+# One in READ_EVERY operations reads another worker's match; one in CONTEND_EVERY scores the shared match
+READ_EVERY = 4
+CONTEND_EVERY = 10
+
+
+def bowl(rng):
+    def command(match):
+        if innings_over(match):
+            return None
+        return random_ball(match, rng)
+    return command
+
+
+def worker(path, worker_id, own_ids, other_ids, contended_id, balls, results):
+    store = SQLiteMatchStore(path)
+    registry = MatchRegistry(store, shared=True)
+    rng = random.Random(worker_id)
+    latencies = []
+    scored = {}
+    reads = 0
+    started = time.perf_counter()
+    for i in range(balls):
+        if other_ids and i % READ_EVERY == READ_EVERY - 1:
+            registry.read(rng.choice(other_ids), lambda match: match.get_match_summary())
+            reads += 1
+        match_id = contended_id if i % CONTEND_EVERY == CONTEND_EVERY - 1 else own_ids[i % len(own_ids)]
+        ball_started = time.perf_counter()
+        event, _ = registry.execute(match_id, bowl(rng), log_op='ball')
+        latencies.append((time.perf_counter() - ball_started) * 1000)
+        if event is not None:
+            scored[match_id] = scored.get(match_id, 0) + 1
+    results.put((worker_id, time.perf_counter() - started, latencies, scored, reads))
+
+
+def run(workers, balls):
+    path = os.path.join(tempfile.mkdtemp(prefix='cricsmart-workers-'), 'matches.db')
+    setup = MatchRegistry(SQLiteMatchStore(path))
+    owned = [[setup.create(new_match(overs=50)) for _ in range(MATCHES_PER_WORKER)] for _ in range(workers)]
+    contended_id = setup.create(new_match(overs=50))
+    initial = {match_id: len(setup.get(match_id).match.events) for match_id in setup.ids()}
+    setup.store.close()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = []
+    for worker_id in range(workers):
+        others = [match_id for i, ids in enumerate(owned) if i != worker_id for match_id in ids]
+        process = context.Process(target=worker, args=(path, worker_id, owned[worker_id], others,
+                                                       contended_id, balls, results))
+        processes.append(process)
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(ms for report in reports for ms in report[2])
+    scored = {}
+    for report in reports:
+        for match_id, count in report[3].items():
+            scored[match_id] = scored.get(match_id, 0) + count
+    reads = sum(report[4] for report in reports)
+
+    # Consistency: a fresh process view of every match holds every ball and replays cleanly
+    store = SQLiteMatchStore(path)
+    problems = []
+    for match_id, before in initial.items():
+        match = store.load(match_id)
+        expected = before + scored.get(match_id, 0)
+        if len(match.events) != expected:
+            problems.append(f"{match_id}: {len(match.events)} balls stored, {expected} scored")
+        problems.extend(f"{match_id}: {problem}" for problem in verify(match))
+    store.close()
+    return {
+        'ops_per_second': (len(latencies) + reads) / wall,
+        'balls_per_second': len(latencies) / wall,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'problems': problems
+    }
+
+
+def main():
+    balls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'workers':>8} {'ops/s':>9} {'balls/s':>9} {'p50 ms':>8} {'p99 ms':>8}  consistency")
+    failed = False
+    for workers in WORKERS:
+        report = run(workers, balls)
+        status = 'OK' if not report['problems'] else f"{len(report['problems'])} problems"
+        print(f"{workers:>8} {report['ops_per_second']:>9.0f} {report['balls_per_second']:>9.0f} "
+              f"{report['p50_ms']:>8.2f} {report['p99_ms']:>8.2f}  {status}")
+        for problem in report['problems'][:10]:
+            print(f"         - {problem}")
+        failed = failed or bool(report['problems'])
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
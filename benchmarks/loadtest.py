@@ -0,0 +1,388 @@
+"""
+Match-day load test
+Plays N concurrent matches through the real HTTP API (/api/start,
+/api/add_player, /api/set_openers, /api/score, /api/extra, /api/wicket,
+/api/set_bowler, /api/switch_innings and /api/generate-pdf) with the
+seeded ball distributions of synthetic.py, while M spectators per match
+poll /api/state the way the page does (revalidating with If-None-Match).
+Reports throughput, latency percentiles per route and the server's RSS,
+and writes everything to a JSON file so runs can be compared across
+versions (--compare OLD.json prints the differences).
+
+The server is started locally on a free port (python asgi_app.py, which
+needs uvicorn), or given with --url; --in-process drives asgi_app.app
+directly instead, without sockets.
+Usage: python benchmarks/loadtest.py [--matches N] [--spectators M] [--overs O]
+       [--poll SECONDS] [--url URL | --in-process] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# Add project root and benchmarks to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import RUN_WEIGHTS, EXTRA_WEIGHTS, WICKET_RATE, WICKET_WEIGHTS, _pick
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+PLAYERS = 11
+
+
+class HTTPClient:
+    """Keep-alive HTTP/1.1 client with one connection per thread"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = dict(headers or {})
+        if payload is not None:
+            headers['content-type'] = 'application/json'
+        for attempt in (1, 2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            try:
+                connection.request(method, path, payload, headers)
+                response = connection.getresponse()
+                return response.status, {k.lower(): v for k, v in response.getheaders()}, response.read()
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                self._local.connection = None
+                if attempt == 2:
+                    raise
+
+
+class ASGIClient:
+    """Sends requests straight to asgi_app.app on an event loop in a background thread"""
+
+    def __init__(self):
+        import asgi_app
+        self.app = asgi_app.app
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    async def _call(self, method, path, payload, headers):
+        path, _, query = path.partition('?')
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+                 'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]}
+        response = {'body': b''}
+
+        async def receive():
+            return {'type': 'http.request', 'body': payload or b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = {k.decode('latin-1'): v.decode('latin-1') for k, v in message['headers']}
+            else:
+                response['body'] += message.get('body', b'')
+
+        await self.app(scope, receive, send)
+        return response['status'], response['headers'], response['body']
+
+    def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        return asyncio.run_coroutine_threadsafe(self._call(method, path, payload, dict(headers or {})), self.loop).result()
+
+
+class Recorder:
+    """Latency samples and status codes per route"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def timed(self, client, method, path, body=None, headers=None, route=None):
+        route = route or f"{method} {path.split('?', 1)[0]}"
+        started = time.perf_counter()
+        try:
+            status, response_headers, data = client.request(method, path, body, headers)
+        except Exception:
+            status, response_headers, data = 'error', {}, b''
+        ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies[route].append(ms)
+            self.statuses[route][str(status)] += 1
+        return status, response_headers, data
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def rss_kb(pid):
+    """Current and peak resident set size of a process (Linux /proc), in KB"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]), int(fields['VmHWM'].split()[0])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+class Scorer:
+    """Scores one match ball by ball through the API"""
+
+    def __init__(self, client, recorder, index, overs, seed):
+        self.client = client
+        self.recorder = recorder
+        self.index = index
+        self.overs = overs
+        self.rng = random.Random(seed)
+        self.match_id = None
+        self.done = threading.Event()
+        self.balls = 0
+
+    def post(self, path, body, route=None):
+        body = dict(body, match_id=self.match_id) if self.match_id else body
+        status, _, data = self.recorder.timed(self.client, 'POST', path, body, route=route)
+        if status != 200:
+            raise RuntimeError(f"{path} failed with {status}: {data[:200]!r}")
+        return json.loads(data)
+
+    def squad(self, key):
+        status, _, data = self.recorder.timed(self.client, 'GET', f"/api/state?match_id={self.match_id}")
+        return json.loads(data)['snapshot'][f"team_{key}"]['players']
+
+    def run(self):
+        try:
+            self.play()
+        finally:
+            self.done.set()
+
+    def play(self):
+        name = f"Load Match {self.index}"
+        self.match_id = self.post('/api/start', {'team_a': f"{name} A", 'team_b': f"{name} B",
+                                                 'overs': self.overs, 'match_name': name})['match_id']
+        for key in ('a', 'b'):
+            for i in range(PLAYERS):
+                role = 'batsman' if i < 6 else 'bowler' if i > 7 else 'all-rounder'
+                self.post('/api/add_player', {'team': key, 'name': f"Player {key.upper()}{i + 1}", 'role': role})
+        squads = {key: [player['id'] for player in self.squad(key)] for key in ('a', 'b')}
+
+        target = None
+        for batting, bowling in (('a', 'b'), ('b', 'a')):
+            bowlers = squads[bowling][6:]
+            summary = self.post('/api/set_openers', {'striker_id': squads[batting][0],
+                                                     'non_striker_id': squads[batting][1],
+                                                     'bowler_id': bowlers[0]})['summary']
+            over = 0
+            while summary['striker'] and summary['overs'] != f"{self.overs}.0" and \
+                    (target is None or summary['runs'] < target):
+                summary = self.bowl(squads[bowling])
+                self.balls += 1
+                if summary['striker'] and summary['overs'].endswith('.0') and int(summary['overs'].split('.')[0]) > over:
+                    over += 1
+                    self.post('/api/set_bowler', {'bowler_id': bowlers[over % len(bowlers)]})
+            if target is None:
+                target = summary['runs'] + 1
+                self.post('/api/switch_innings', {})
+        self.recorder.timed(self.client, 'POST', '/api/generate-pdf', {'match_id': self.match_id})
+
+    def bowl(self, fielders):
+        extra_type = _pick(self.rng, EXTRA_WEIGHTS)
+        if extra_type is not None:
+            runs = _pick(self.rng, RUN_WEIGHTS) if extra_type == 'no-ball' else self.rng.choice([0, 0, 1, 1, 4])
+            return self.post('/api/extra', {'extra_type': extra_type, 'runs': runs})['summary']
+        if self.rng.random() < WICKET_RATE:
+            wicket_type = _pick(self.rng, WICKET_WEIGHTS)
+            body = {'wicket_type': wicket_type.value}
+            if wicket_type.name in ('CAUGHT', 'STUMPED'):
+                body['catcher_id'] = self.rng.choice(fielders)
+            return self.post('/api/wicket', body)['summary']
+        return self.post('/api/score', {'runs': _pick(self.rng, RUN_WEIGHTS)})['summary']
+
+
+def spectate(client, recorder, scorer, poll, seed):
+    """Poll the match's state until it is over, revalidating with the last ETag like a browser"""
+    rng = random.Random(seed)
+    etag = None
+    while scorer.match_id is None and not scorer.done.is_set():
+        time.sleep(0.01)
+    time.sleep(rng.random() * poll)  # spread the viewers out
+    while not scorer.done.is_set():
+        headers = {'accept-encoding': 'gzip'}
+        if etag:
+            headers['if-none-match'] = etag
+        status, response_headers, _ = recorder.timed(client, 'GET', f"/api/state?match_id={scorer.match_id}",
+                                                     headers=headers)
+        etag = response_headers.get('etag', etag)
+        scorer.done.wait(poll)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server():
+    """Run asgi_app.py on a free port with a fresh store; returns (process, url)"""
+    port = free_port()
+    env = dict(os.environ, CRICSMART_DB_PATH=os.path.join(tempfile.mkdtemp(prefix='cricsmart-load-'), 'matches.db'))
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'asgi_app.py'), '--port', str(port)],
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    url = f"http://127.0.0.1:{port}"
+    client = HTTPClient(url)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited: {process.stderr.read().decode()}")
+        try:
+            client.request('GET', '/api/status')
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit("Server did not start within 30 seconds")
+
+
+def run(args):
+    process = None
+    if args.in_process:
+        os.environ.setdefault('CRICSMART_STORE', 'memory')
+        client, target, pid = ASGIClient(), 'in-process', os.getpid()
+    else:
+        if args.url:
+            url = args.url
+        else:
+            process, url = start_server()
+        client, target, pid = HTTPClient(url), url, process.pid if process else None
+
+    recorder = Recorder()
+    scorers = [Scorer(client, recorder, i, args.overs, args.seed + i) for i in range(args.matches)]
+    threads = [threading.Thread(target=scorer.run) for scorer in scorers]
+    threads += [threading.Thread(target=spectate, args=(client, recorder, scorer, args.poll, args.seed * 1000 + i * 100 + j))
+                for i, scorer in enumerate(scorers) for j in range(args.spectators)]
+
+    peak_rss = 0
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        if pid:
+            rss, hwm = rss_kb(pid)
+            peak_rss = max(peak_rss, hwm or rss or 0)
+        time.sleep(0.2)
+    wall = time.perf_counter() - started
+    rss, hwm = rss_kb(pid) if pid else (None, None)
+    if process:
+        process.terminate()
+        process.wait()
+
+    routes = {}
+    for route, values in sorted(recorder.latencies.items()):
+        routes[route] = {
+            'requests': len(values),
+            'per_second': round(len(values) / wall, 1),
+            'p50_ms': round(percentile(values, 0.5), 2),
+            'p95_ms': round(percentile(values, 0.95), 2),
+            'p99_ms': round(percentile(values, 0.99), 2),
+            'max_ms': round(max(values), 2),
+            'statuses': dict(recorder.statuses[route])
+        }
+    total = sum(len(values) for values in recorder.latencies.values())
+    all_latencies = [ms for values in recorder.latencies.values() for ms in values]
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'target': target,
+        'config': {'matches': args.matches, 'spectators': args.spectators, 'overs': args.overs,
+                   'poll_seconds': args.poll, 'seed': args.seed},
+        'seconds': round(wall, 2),
+        'balls': sum(scorer.balls for scorer in scorers),
+        'requests': total,
+        'requests_per_second': round(total / wall, 1),
+        'p50_ms': round(percentile(all_latencies, 0.5), 2),
+        'p99_ms': round(percentile(all_latencies, 0.99), 2),
+        'rss_kb': rss,
+        'peak_rss_kb': max(peak_rss, hwm or 0) or None,
+        'routes': routes
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(result, previous=None):
+    print(f"{result['target']}: {result['config']['matches']} matches x {result['config']['spectators']} spectators, "
+          f"{result['balls']} balls in {result['seconds']} s")
+    print(f"{result['requests']} requests, {result['requests_per_second']} req/s, "
+          f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, peak RSS {result['peak_rss_kb']} KB")
+    print(f"\n{'route':<28} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for route, stats in result['routes'].items():
+        line = (f"{route:<28} {stats['requests']:>9} {stats['per_second']:>8} {stats['p50_ms']:>8} "
+                f"{stats['p95_ms']:>8} {stats['p99_ms']:>8}  {stats['statuses']}")
+        old = previous['routes'].get(route) if previous else None
+        if old:
+            line += f"  (p99 {stats['p99_ms'] - old['p99_ms']:+.2f} ms)"
+        print(line)
+    if previous:
+        print(f"\nvs {previous.get('commit')} ({previous['timestamp']}): "
+              f"req/s {result['requests_per_second'] - previous['requests_per_second']:+.1f}, "
+              f"p99 {result['p99_ms'] - previous['p99_ms']:+.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Match-day load test of the scoring API')
+    parser.add_argument('--matches', type=int, default=4)
+    parser.add_argument('--spectators', type=int, default=10, help='state pollers per match')
+    parser.add_argument('--overs', type=int, default=20)
+    parser.add_argument('--poll', type=float, default=1.0, help='seconds between a spectator\'s polls')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='test a server that is already running')
+    parser.add_argument('--in-process', action='store_true', help='call asgi_app.app directly')
+    parser.add_argument('--output', help='results file (default benchmarks/results/loadtest-TIMESTAMP.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+    if not args.url and not args.in_process:
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise SystemExit("Starting a server needs uvicorn (pip install uvicorn); use --url or --in-process")
+
+    result = run(args)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    report(result, previous)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Concurrency stress test for the scoring pipeline
+Many threads hammer /api/score, /api/extra, /api/wicket and /api/undo on
+the same matches (some with stale versions), then the match invariants are
+checked: running tallies, totals against player stats, ball counts, and
+recovery from the store
+Usage: python benchmarks/stress_concurrency.py [threads] [requests_per_thread]
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+from collections import Counter
+
+# Add project root and benchmarks to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('CRICSMART_STORE', 'memory')
+
+import asgi_app
+from synthetic import new_match
+
+MATCHES = 2
+
+
+async def post(path, body):
+    """Send one JSON POST through the ASGI app and return (status, response json)"""
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'query_string': b'', 'headers': []}
+    payload = json.dumps(body).encode()
+    response = {'body': b''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'] += message.get('body', b'')
+
+    await asgi_app.app(scope, receive, send)
+    return response['status'], json.loads(response['body'])
+
+
+def hammer(seed, requests, match_ids, statuses):
+    rng = random.Random(seed)
+
+    async def run():
+        version = None
+        for _ in range(requests):
+            match_id = rng.choice(match_ids)
+            body = {'match_id': match_id}
+            # A quarter of the requests claim a version, usually an out-of-date one
+            if version is not None and rng.random() < 0.25:
+                body['version'] = version
+            roll = rng.random()
+            if roll < 0.55:
+                status, data = await post('/api/score', {**body, 'runs': rng.choice([0, 1, 1, 2, 4, 6])})
+            elif roll < 0.65:
+                status, data = await post('/api/extra', {**body, 'extra_type': rng.choice(['wide', 'no-ball', 'bye', 'leg-bye']),
+                                                         'runs': rng.choice([0, 1])})
+            elif roll < 0.68:
+                status, data = await post('/api/wicket', {**body, 'wicket_type': 'Bowled'})
+            else:
+                status, data = await post('/api/undo', body)
+            version = data.get('version', version)
+            statuses[status] += 1
+
+    asyncio.run(run())
+
+
+def check(match_id):
+    """Verify the invariants of one match; returns a list of problems"""
+    match = asgi_app.registry.get(match_id).match
+    problems = []
+    tally = match.tally
+    if not match.verify_tallies():
+        problems.append("running tallies differ from a rebuild from events")
+    if tally.runs != match.total_runs:
+        problems.append(f"tally runs {tally.runs} != total_runs {match.total_runs}")
+    if tally.wickets != match.wickets:
+        problems.append(f"tally wickets {tally.wickets} != wickets {match.wickets}")
+    batting_runs = sum(p.batting_stats.runs for p in match.batting_team.players)
+    # The extras count a wide as one, whatever was run off it
+    wide_runs = sum(event.runs for event in match.events if event.extra_type == 'wide')
+    if batting_runs + tally.extras + wide_runs != match.total_runs:
+        problems.append(f"batsmen {batting_runs} + extras {tally.extras} + runs off wides {wide_runs} "
+                        f"!= total {match.total_runs}")
+    bowling_runs = sum(p.bowling_stats.runs for p in match.bowling_team.players)
+    if bowling_runs + tally.byes + tally.leg_byes != match.total_runs:
+        problems.append(f"bowlers {bowling_runs} + byes != total {match.total_runs}")
+    bowled = sum(p.bowling_stats.balls for p in match.bowling_team.players)
+    if bowled != tally.legal_balls or bowled != match.current_over * 6 + match.current_ball:
+        problems.append(f"bowler balls {bowled} != legal balls {tally.legal_balls}")
+    recovered = asgi_app.store.load(match_id)
+    if recovered.to_snapshot() != match.to_snapshot():
+        problems.append("store recovery differs from the live match")
+    return problems
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    match_ids = [asgi_app.registry.create(new_match(overs=10_000, players=500)) for _ in range(MATCHES)]
+    statuses = Counter()
+    workers = [threading.Thread(target=hammer, args=(i, requests, match_ids, statuses)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    print(f"{threads} threads x {requests} requests: {dict(statuses)}")
+    failed = False
+    for match_id in match_ids:
+        problems = check(match_id)
+        match = asgi_app.registry.get(match_id).match
+        print(f"{match_id}: {match.total_runs}/{match.wickets} after {len(match.events)} balls, "
+              f"version {match.version}: {'OK' if not problems else 'FAILED'}")
+        for problem in problems:
+            print(f"  - {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
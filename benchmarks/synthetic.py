@@ -0,0 +1,100 @@
+"""
+Deterministic synthetic matches for benchmarks
+Plays seeded ball-by-ball matches through MatchState.score_ball with
+realistic outcome distributions
+"""
+
+import os
+import random
+import sys
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import MatchState, Team, Player, PlayerRole, WicketType, NON_LEGAL_EXTRAS
+
+RUN_WEIGHTS = [(0, 38), (1, 33), (2, 9), (3, 1), (4, 12), (6, 5)]
+EXTRA_WEIGHTS = [(None, 92), ("wide", 4), ("no-ball", 1), ("bye", 1), ("leg-bye", 2)]
+WICKET_RATE = 0.025
+WICKET_WEIGHTS = [(WicketType.CAUGHT, 55), (WicketType.BOWLED, 20), (WicketType.LBW, 12),
+                  (WicketType.RUN_OUT, 8), (WicketType.STUMPED, 4), (WicketType.HIT_WICKET, 1)]
+
+
+def _pick(rng, weights):
+    values, counts = zip(*weights)
+    return rng.choices(values, weights=counts)[0]
+
+
+def make_team(name, size=11):
+    """Create a team with deterministic player IDs"""
+    team = Team(name)
+    prefix = name.lower().replace(" ", "-")
+    for i in range(size):
+        role = PlayerRole.BATSMAN if i < 6 else PlayerRole.BOWLER if i > 7 else PlayerRole.ALL_ROUNDER
+        team.add_player(Player(id=f"{prefix}-{i + 1}", name=f"{name} Player {i + 1}", role=role))
+    return team
+
+
+def new_match(overs=20, players=11, name="Synthetic Match"):
+    """Create a match with two teams, ready for the first ball"""
+    match = MatchState(team_a=make_team("Team A", players), team_b=make_team("Team B", players))
+    match.match_name = name
+    match.max_overs = overs
+    match.batting_team, match.bowling_team = match.team_a, match.team_b
+    match.batting_first_team_name = match.team_a.team_name
+    start_innings(match)
+    return match
+
+
+def start_innings(match):
+    """Send in the openers and the first bowler"""
+    batting = match.batting_team
+    match.set_openers(batting.players[0].id, batting.players[1].id, _next_bowler(match).id)
+
+
+def _next_bowler(match):
+    bowlers = match.bowling_team.get_bowlers() or match.bowling_team.players
+    previous = match.current_bowler
+    choices = [b for b in bowlers if b is not previous] or bowlers
+    return choices[match.current_over % len(choices)]
+
+
+def score_ball(match, runs, extra_type=None, wicket_type=None, catcher_id=None):
+    """Score one delivery, bringing on the next bowler at the end of an over"""
+    event = match.score_ball(runs, extra_type, wicket_type, catcher_id)
+    if match.current_ball == 0 and event.extra_type not in NON_LEGAL_EXTRAS and match.striker:
+        match.set_bowler(_next_bowler(match).id)
+    return event
+
+
+def random_ball(match, rng):
+    """Score one delivery drawn from realistic outcome distributions"""
+    extra_type = _pick(rng, EXTRA_WEIGHTS)
+    runs = _pick(rng, RUN_WEIGHTS) if extra_type in (None, "no-ball") else rng.choice([0, 0, 1, 1, 4])
+    wicket_type = None
+    catcher_id = None
+    if extra_type is None and rng.random() < WICKET_RATE:
+        wicket_type = _pick(rng, WICKET_WEIGHTS)
+        runs = 0
+        if wicket_type in (WicketType.CAUGHT, WicketType.STUMPED):
+            catcher_id = rng.choice(match.bowling_team.players).id
+    return score_ball(match, runs, extra_type, wicket_type, catcher_id)
+
+
+def innings_over(match):
+    return match.striker is None or match.is_innings_complete()
+
+
+def play_match(overs=20, seed=0, players=11, on_ball=None):
+    """Play a full deterministic two-innings match; on_ball(match, event) is called after each ball"""
+    rng = random.Random(seed)
+    match = new_match(overs, players)
+    for innings in (1, 2):
+        while not innings_over(match):
+            event = random_ball(match, rng)
+            if on_ball:
+                on_ball(match, event)
+        if innings == 1:
+            match.switch_innings()
+            start_innings(match)
+    return match
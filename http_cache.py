@@ -0,0 +1,168 @@
+"""
+HTTP compression and cache validators for the Cricket Scoring Application
+Negotiates gzip (and brotli, when the optional brotli package is installed)
+from Accept-Encoding, keeps static files and their compressed variants in
+memory with strong ETags, and builds version-based ETags for match state so
+polling viewers whose copy is current get an empty 304.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from precompress import is_fresh
+
+try:
+    import brotli
+except ImportError:  # optional dependency: pip install cricsmart[brotli]
+    brotli = None
+
+# Supported content codings, most preferred first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+# Bodies smaller than this are sent as they are
+MIN_COMPRESS_SIZE = 1024
+# Dynamic responses trade ratio for speed; static variants are built once at the highest level
+DYNAMIC_LEVELS = {'gzip': 6, 'br': 5}
+STATIC_LEVELS = {'gzip': 9, 'br': 11}
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def compressible(content_type: str) -> bool:
+    media_type = content_type.split(';', 1)[0].strip()
+    return media_type.startswith('text/') or media_type in COMPRESSIBLE_TYPES
+
+
+def accepted_encoding(accept_encoding: Optional[str], available=ENCODINGS) -> Optional[str]:
+    """The best of available that Accept-Encoding allows (None means send it uncompressed)"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, levels: Dict[str, int] = DYNAMIC_LEVELS) -> bytes:
+    if encoding == 'gzip':
+        # mtime=0 so equal bodies compress to equal bytes
+        return gzip.compress(data, compresslevel=levels['gzip'], mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=levels['br'])
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+def encode_body(body: bytes, content_type: str, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Compress a dynamic response body if it is worth it and the client accepts it"""
+    if len(body) < MIN_COMPRESS_SIZE or not compressible(content_type):
+        return body, None
+    encoding = accepted_encoding(accept_encoding)
+    if encoding is None:
+        return body, None
+    return compress(body, encoding), encoding
+
+
+def strong_etag(data: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def version_etag(*parts) -> str:
+    """Weak ETag for a representation determined by parts (e.g. match ID and version)"""
+    return 'W/"%s"' % ':'.join(str(part) for part in parts)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = _opaque(etag)
+    return any(_opaque(tag) == opaque for tag in if_none_match.split(','))
+
+
+@dataclass
+class StaticAsset:
+    """A static file's bytes, content type and strong ETag, with its compressed variants"""
+    content_type: str
+    mtime: float
+    body: bytes
+    etag: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str], str]:
+        """(body, content coding, ETag) of the best representation for the client"""
+        encoding = accepted_encoding(accept_encoding, [e for e in ENCODINGS if e in self.variants])
+        if encoding is None:
+            return self.body, None, self.etag
+        # Each coding is a different representation, so it gets its own strong ETag
+        return self.variants[encoding], encoding, f'{self.etag[:-1]}-{encoding}"'
+
+
+class StaticCache:
+    """Static files kept in memory with precomputed ETags and compressed variants
+
+    A file is read and compressed on first request and again only when its
+    modification time changes; gzip copies written by precompress.py are
+    used as they are.
+    """
+
+    def __init__(self):
+        self._assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        asset = self._assets.get(path)
+        if asset is not None and asset.mtime == mtime:
+            return asset
+        asset = self._load(path, mtime)
+        with self._lock:
+            self._assets[path] = asset
+        return asset
+
+    def _load(self, path: str, mtime: float) -> StaticAsset:
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        asset = StaticAsset(content_type, mtime, body, strong_etag(body))
+        if len(body) < MIN_COMPRESS_SIZE or not compressible(content_type):
+            return asset
+        for encoding in ENCODINGS:
+            if encoding == 'gzip' and is_fresh(path, path + '.gz'):
+                with open(path + '.gz', 'rb') as f:
+                    variant = f.read()
+            else:
+                variant = compress(body, encoding, STATIC_LEVELS)
+            if len(variant) < len(body):
+                asset.variants[encoding] = variant
+        return asset
+
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
@@ -0,0 +1,166 @@
+"""
+Tournament leaderboards for the Cricket Scoring Application
+Player stats from many matches are loaded into columns (NumPy arrays when
+NumPy is installed, plain lists otherwise), aggregated per player and
+ranked without sorting the whole table.
+
+Players are matched across games by normalized name, since player IDs are
+assigned per match. NumPy is imported on first use, not at import time,
+so app cold starts that never rank players do not pay for it.
+"""
+
+import heapq
+from importlib.util import find_spec
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models import MatchState, normalize_player_name
+
+# Optional dependency: pip install cricsmart[fast]
+ENGINE = 'numpy' if find_spec('numpy') is not None else 'python'
+
+
+def _numpy():
+    """The numpy module, or None when it is not installed"""
+    if ENGINE != 'numpy':
+        return None
+    import numpy
+    return numpy
+
+# Per-player per-match row: key, name, team, then the COUNT_COLUMNS values
+COUNT_COLUMNS = ('matches', 'innings', 'outs', 'runs', 'balls', 'fours', 'sixes',
+                 'bowling_balls', 'runs_conceded', 'wickets', 'mvp')
+RATE_COLUMNS = ('strike_rate', 'batting_average', 'economy', 'bowling_average')
+PlayerRow = Tuple[str, str, str, int, int, int, int, int, int, int, int, int, int, int]
+
+# metric -> (higher is better, qualifying column, default minimum of that column)
+METRICS = {
+    'runs': (True, None, 0),
+    'wickets': (True, None, 0),
+    'sixes': (True, None, 0),
+    'fours': (True, None, 0),
+    'mvp': (True, None, 0),
+    'strike_rate': (True, 'balls', 30),
+    'batting_average': (True, 'outs', 1),
+    'economy': (False, 'bowling_balls', 60),
+    'bowling_average': (False, 'wickets', 1),
+}
+
+
+def player_rows(match: MatchState) -> List[PlayerRow]:
+    """One row per squad member of match (call with the match lock held)"""
+    dismissed = match.get_all_dismissals()
+    rows = []
+    for team in (match.team_a, match.team_b):
+        if team is None:
+            continue
+        batted = set(team.batting_order)
+        for player in team.players:
+            batting, bowling = player.batting_stats, player.bowling_stats
+            # Same player-of-the-match score as MatchState.get_match_result
+            mvp = batting.runs + bowling.wickets * 20 + bowling.runs // 10
+            rows.append((
+                normalize_player_name(player.name), player.name, team.team_name,
+                1, int(player.id in batted), int(player.id in dismissed),
+                batting.runs, batting.balls, batting.fours, batting.sixes,
+                bowling.balls, bowling.runs, bowling.wickets, mvp
+            ))
+    return rows
+
+
+class Leaderboard:
+    """Aggregated player totals with derived rates and top-k rankings"""
+
+    def __init__(self, rows: Iterable[PlayerRow]):
+        index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.teams: List[str] = []
+        positions = []
+        counts = []
+        for row in rows:
+            position = index.get(row[0])
+            if position is None:
+                position = index[row[0]] = len(self.names)
+                self.names.append(row[1])
+                self.teams.append(row[2])
+            positions.append(position)
+            counts.append(row[3:])
+        self.size = len(self.names)
+        self.columns = self._aggregate(positions, counts)
+        self._derive()
+
+    def _aggregate(self, positions: List[int], counts: List[Tuple[int, ...]]) -> Dict[str, Any]:
+        np = _numpy()
+        if np is not None:
+            values = np.array(counts, dtype=np.int64).reshape(len(counts), len(COUNT_COLUMNS))
+            totals = np.zeros((self.size, len(COUNT_COLUMNS)), dtype=np.int64)
+            np.add.at(totals, np.array(positions, dtype=np.intp), values)
+            return {name: totals[:, i] for i, name in enumerate(COUNT_COLUMNS)}
+        totals = [[0] * self.size for _ in COUNT_COLUMNS]
+        for position, row in zip(positions, counts):
+            for column, value in zip(totals, row):
+                column[position] += value
+        return dict(zip(COUNT_COLUMNS, totals))
+
+    def _derive(self):
+        c = self.columns
+        self.columns['strike_rate'] = self._ratio(c['runs'], c['balls'], 100)
+        self.columns['batting_average'] = self._ratio(c['runs'], c['outs'])
+        self.columns['economy'] = self._ratio(c['runs_conceded'], c['bowling_balls'], 6)
+        self.columns['bowling_average'] = self._ratio(c['runs_conceded'], c['wickets'])
+
+    def _ratio(self, numerator, denominator, scale: float = 1):
+        """numerator / denominator * scale, 0 where the denominator is 0"""
+        np = _numpy()
+        if np is not None:
+            result = np.zeros(self.size, dtype=np.float64)
+            np.divide(numerator * scale, denominator, out=result, where=denominator > 0)
+            return result
+        return [n * scale / d if d else 0.0 for n, d in zip(numerator, denominator)]
+
+    def top(self, metric: str = 'runs', limit: int = 10, min_qualifier: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Best `limit` players by metric, among those meeting the metric's qualifier
+
+        min_qualifier overrides the default minimum (balls faced for strike
+        rate, balls bowled for economy, dismissals/wickets for averages).
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown leaderboard metric: {metric}")
+        descending, qualifier, default_min = METRICS[metric]
+        minimum = default_min if min_qualifier is None else min_qualifier
+        values = self.columns[metric]
+        if self.size == 0 or limit <= 0:
+            return []
+
+        np = _numpy()
+        if np is not None:
+            keys = values if descending else -values
+            candidates = np.flatnonzero(self.columns[qualifier] >= minimum) if qualifier else np.arange(self.size)
+            if len(candidates) > limit:
+                # Keep everything tied with the limit-th best so ties break by position, as below
+                cutoff = np.partition(-keys[candidates], limit - 1)[limit - 1]
+                candidates = candidates[-keys[candidates] <= cutoff]
+            order = candidates[np.lexsort((candidates, -keys[candidates]))][:limit]
+            return [self.player(int(i)) for i in order]
+
+        sign = 1 if descending else -1
+        candidates = range(self.size) if not qualifier else \
+            [i for i, value in enumerate(self.columns[qualifier]) if value >= minimum]
+        order = heapq.nlargest(limit, candidates, key=lambda i: (sign * values[i], -i))
+        return [self.player(i) for i in order]
+
+    def player(self, position: int) -> Dict[str, Any]:
+        """All totals and rates of one player"""
+        data = {'name': self.names[position], 'team': self.teams[position]}
+        for name in COUNT_COLUMNS:
+            data[name] = int(self.columns[name][position])
+        for name in RATE_COLUMNS:
+            data[name] = round(float(self.columns[name][position]), 2)
+        return data
+
+
+def build_leaderboard(matches: Iterable[MatchState]) -> Leaderboard:
+    """Aggregate every player of matches"""
+    rows: List[PlayerRow] = []
+    for match in matches:
+        rows.extend(player_rows(match))
+    return Leaderboard(rows)
@@ -0,0 +1,246 @@
+"""
+Live score push for spectators (Server-Sent Events)
+The scorer's handler publishes after committing a ball; each match has one
+channel that encodes the delta once and fans the same frame out to every
+subscriber, so idle spectators cost no work between balls
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from models import MatchState
+
+# Frames kept per match; subscribers further behind are resynced with a snapshot
+FRAME_HISTORY = 64
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15.0
+
+# read(reader) runs reader on the match with no command running meanwhile (e.g.
+# MatchRegistry.read) and returns its result, or None if the match is gone
+MatchReader = Callable[[Callable[[MatchState], Any]], Any]
+
+
+def format_sse(data: dict, event: Optional[str] = None, event_id: Optional[int] = None) -> bytes:
+    """Encode one Server-Sent Events frame"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(',', ':')))
+    return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+
+class MatchChannel:
+    """Fan-out point for one match: a short history of encoded delta frames and a condition to wait on"""
+
+    def __init__(self, history: int = FRAME_HISTORY):
+        self._cond = threading.Condition()
+        self._frames: deque = deque(maxlen=history)  # (since_version, version, frame)
+        self.version: Optional[int] = None
+        self.subscribers = 0
+        self.closed = False
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _wake_async_waiters(self):
+        for loop, future in self._async_waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        self._async_waiters.clear()
+
+    def publish(self, match: MatchState):
+        """Encode the change since the last publish and wake every subscriber"""
+        with self._cond:
+            if self.version is None:
+                # First publish only sets the baseline; subscribers start from a snapshot
+                self.version = match.version
+                return
+            if self.version == match.version:
+                return
+            since = self.version
+            delta = match.diff(since)
+            if 'snapshot' in delta:
+                frame = format_sse(delta['snapshot'], 'snapshot', match.version)
+                self._frames.clear()
+            else:
+                frame = format_sse(delta, 'delta', match.version)
+            self._frames.append((since, match.version, frame))
+            self.version = match.version
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def frames_after(self, version: int) -> Optional[Tuple[List[bytes], int]]:
+        """Frames that bring a client from version up to date, and the version they reach
+
+        Returns None if the client is too far behind and must resync from a snapshot.
+        Call with the channel condition held.
+        """
+        if version == self.version:
+            return [], version
+        frames = []
+        for since, frame_version, frame in self._frames:
+            if frame_version <= version:
+                continue
+            if not frames and since != version:
+                return None
+            frames.append(frame)
+            version = frame_version
+        return (frames, version) if frames else None
+
+    def wait(self, version: int, timeout: float) -> Optional[Tuple[List[bytes], int]]:
+        """Block until there is something newer than version (or timeout, returning no frames)"""
+        with self._cond:
+            if self.version == version and not self.closed:
+                self._cond.wait(timeout)
+            if self.closed:
+                return [], version
+            return self.frames_after(version)
+
+    async def wait_async(self, version: int, timeout: float) -> Optional[Tuple[List[bytes], int]]:
+        """Coroutine version of wait() for asyncio servers"""
+        with self._cond:
+            if self.version != version or self.closed:
+                return ([], version) if self.closed else self.frames_after(version)
+            future = asyncio.get_running_loop().create_future()
+            self._async_waiters.append((asyncio.get_running_loop(), future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._cond:
+            if (future.get_loop(), future) in self._async_waiters:
+                self._async_waiters.remove((future.get_loop(), future))
+            if self.closed:
+                return [], version
+            return self.frames_after(version)
+
+    def close(self):
+        """Release all waiting subscribers (match deleted or server shutting down)"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+
+class LiveFeed:
+    """Registry of per-match channels"""
+
+    def __init__(self):
+        self._channels: Dict[str, MatchChannel] = {}
+        self._lock = threading.Lock()
+
+    def channel(self, match_id: str) -> MatchChannel:
+        with self._lock:
+            channel = self._channels.get(match_id)
+            if channel is None:
+                channel = self._channels[match_id] = MatchChannel()
+            return channel
+
+    def publish(self, match_id: str, match: MatchState):
+        """Call after a scoring handler commits a change to match"""
+        with self._lock:
+            channel = self._channels.get(match_id)
+        # Nobody has subscribed yet: nothing to encode
+        if channel is not None:
+            channel.publish(match)
+
+    def close(self, match_id: str):
+        with self._lock:
+            channel = self._channels.pop(match_id, None)
+        if channel is not None:
+            channel.close()
+
+    def subscriber_count(self, match_id: str) -> int:
+        with self._lock:
+            channel = self._channels.get(match_id)
+        return channel.subscribers if channel else 0
+
+    def stream(self, match_id: str, read: MatchReader,
+               last_event_id: Optional[int] = None,
+               heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[bytes]:
+        """Generate the SSE byte stream for one spectator (body of /api/stream?match_id=)
+
+        Starts with a snapshot unless last_event_id (the Last-Event-ID header)
+        can be continued from the channel history.
+        """
+        channel = self.channel(match_id)
+        with channel._cond:
+            channel.subscribers += 1
+        try:
+            yield b"retry: 3000\n\n"
+            version, frame = self._resync(channel, read, last_event_id)
+            if frame is None:
+                return
+            yield frame
+            while not channel.closed:
+                update = channel.wait(version, heartbeat)
+                if update is None:
+                    version, frame = self._resync(channel, read, None)
+                    if frame is None:
+                        return
+                    yield frame
+                elif update[0]:
+                    frames, version = update
+                    yield from frames
+                else:
+                    yield b": ping\n\n"
+        finally:
+            with channel._cond:
+                channel.subscribers -= 1
+
+    async def stream_async(self, match_id: str, read: MatchReader,
+                           last_event_id: Optional[int] = None,
+                           heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncIterator[bytes]:
+        """Async generator counterpart of stream() for the ASGI app"""
+        channel = self.channel(match_id)
+        with channel._cond:
+            channel.subscribers += 1
+        try:
+            yield b"retry: 3000\n\n"
+            # The match may have to be loaded from the store, so off the event loop
+            version, frame = await asyncio.to_thread(self._resync, channel, read, last_event_id)
+            if frame is None:
+                return
+            yield frame
+            while not channel.closed:
+                update = await channel.wait_async(version, heartbeat)
+                if update is None:
+                    version, frame = await asyncio.to_thread(self._resync, channel, read, None)
+                    if frame is None:
+                        return
+                    yield frame
+                elif update[0]:
+                    frames, version = update
+                    for frame in frames:
+                        yield frame
+                else:
+                    yield b": ping\n\n"
+        finally:
+            with channel._cond:
+                channel.subscribers -= 1
+
+    def _resync(self, channel: MatchChannel, read: MatchReader,
+                last_event_id: Optional[int]) -> Tuple[int, Optional[bytes]]:
+        if last_event_id is not None:
+            with channel._cond:
+                update = channel.frames_after(last_event_id) if channel.version is not None else None
+            if update is not None:
+                frames, version = update
+                return version, b"".join(frames)
+
+        def snapshot(match: MatchState) -> Tuple[int, Dict[str, Any]]:
+            # Under the match lock, so the channel and the snapshot see the same version
+            channel.publish(match)
+            return match.version, match.to_snapshot(ball_logs=False)
+        state = read(snapshot)
+        if state is None:
+            return 0, None
+        version, data = state
+        return version, format_sse(data, 'snapshot', version)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
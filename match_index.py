@@ -0,0 +1,166 @@
+"""
+Match listing index for the Cricket Scoring Application
+Keeps a small header per match (names, score, status, timestamps) in
+lists sorted by last update, one for all matches and one per status and
+per team, so listing a page costs O(log n + page size) however many
+matches are archived. The registry refreshes a header on every commit.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import MatchState, normalize_player_name
+
+STATUSES = ('live', 'completed')
+
+
+@dataclass
+class MatchHeader:
+    match_id: str
+    match_name: Optional[str]
+    team_a: Optional[str]
+    team_b: Optional[str]
+    innings: int
+    runs: int
+    wickets: int
+    overs: str
+    status: str
+    version: int
+    created_at: str
+    updated_at: str
+
+    @classmethod
+    def from_match(cls, match_id: str, match: MatchState, created_at: str, updated_at: str) -> 'MatchHeader':
+        """Build a header (call with the match lock held)"""
+        return cls(
+            match_id=match_id,
+            match_name=match.match_name,
+            team_a=match.team_a.team_name if match.team_a else None,
+            team_b=match.team_b.team_name if match.team_b else None,
+            innings=match.current_innings,
+            runs=match.total_runs,
+            wickets=match.wickets,
+            overs=f"{match.current_over}.{match.current_ball}",
+            status='completed' if match.is_match_complete() else 'live',
+            version=match.version,
+            created_at=created_at,
+            updated_at=updated_at
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @property
+    def sort_key(self) -> Tuple[float, str]:
+        # Newest first; the match ID breaks ties so keys are unique
+        return (-datetime.fromisoformat(self.updated_at).timestamp(), self.match_id)
+
+    def filter_keys(self) -> List[Tuple[str, str]]:
+        keys = [('all', ''), ('status', self.status)]
+        for team in {self.team_a, self.team_b}:
+            if team:
+                keys.append(('team', normalize_player_name(team)))
+        return keys
+
+
+def encode_cursor(key: Tuple[float, str]) -> str:
+    return f"{key[0]!r}|{key[1]}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        position, match_id = cursor.split('|', 1)
+        return float(position), match_id
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class MatchIndex:
+    """Match headers sorted by updated_at (newest first), filterable by status and team"""
+
+    def __init__(self):
+        self._headers: Dict[str, MatchHeader] = {}
+        self._sorted: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._headers)
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._headers
+
+    def get(self, match_id: str) -> Optional[MatchHeader]:
+        return self._headers.get(match_id)
+
+    def headers(self) -> List[MatchHeader]:
+        """Every match's header, in no particular order"""
+        with self._lock:
+            return list(self._headers.values())
+
+    def update(self, header: MatchHeader):
+        """Add or refresh a match's header"""
+        with self._lock:
+            self._unlink(header.match_id)
+            self._headers[header.match_id] = header
+            key = header.sort_key
+            for filter_key in header.filter_keys():
+                insort(self._sorted.setdefault(filter_key, []), key)
+
+    def remove(self, match_id: str):
+        with self._lock:
+            self._unlink(match_id)
+
+    def _unlink(self, match_id: str):
+        old = self._headers.pop(match_id, None)
+        if old is None:
+            return
+        key = old.sort_key
+        for filter_key in old.filter_keys():
+            keys = self._sorted[filter_key]
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+            if not keys:
+                del self._sorted[filter_key]
+
+    def query(self, status: Optional[str] = None, team: Optional[str] = None,
+              limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of headers, newest first, with the cursor of the next page
+
+        With both status and team, the shorter of the two lists is walked
+        and filtered by the other.
+        """
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Unknown match status: {status}")
+        with self._lock:
+            lists = []
+            if status:
+                lists.append(self._sorted.get(('status', status), []))
+            if team:
+                lists.append(self._sorted.get(('team', normalize_player_name(team)), []))
+            if not lists:
+                lists.append(self._sorted.get(('all', ''), []))
+            keys = min(lists, key=len)
+            start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+
+            page: List[MatchHeader] = []
+            next_cursor = None
+            for position in range(start, len(keys)):
+                header = self._headers[keys[position][1]]
+                if status and header.status != status:
+                    continue
+                if team and normalize_player_name(team) not in {
+                        normalize_player_name(name) for name in (header.team_a, header.team_b) if name}:
+                    continue
+                if len(page) == limit:
+                    next_cursor = encode_cursor(page[-1].sort_key)
+                    break
+                page.append(header)
+            return {
+                'matches': page,
+                'next_cursor': next_cursor,
+                'total': len(keys) if len(lists) == 1 else None
+            }
@@ -0,0 +1,255 @@
+"""
+Live match registry for the Cricket Scoring Application
+Holds the in-memory matches and runs every mutation of a match under that
+match's own lock, so different matches proceed in parallel while each
+match is changed one command at a time. Commands can carry the version the
+client last saw; stale ones are rejected instead of being applied on top of
+changes the client has not seen. Every commit also refreshes the match's
+header in the listing index.
+
+In shared mode several worker processes use one SQLite store: each command
+runs inside the store's exclusive (cross-process) write lock and first
+reloads the match if another process has written it since, reads reload
+the same way, and a watcher thread polls the store's header stamps to keep
+the listing index and local live viewers up to date.
+"""
+
+import threading
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import MatchState, BallEvent
+from match_store import MatchStore, SQLiteMatchStore
+from live_feed import LiveFeed
+from match_index import MatchHeader, MatchIndex
+
+
+class StaleVersionError(Exception):
+    """Raised when a command was issued against an out-of-date match version"""
+
+    def __init__(self, expected_version: int, current_version: int):
+        super().__init__(f"Match has changed (version {current_version}, request was for {expected_version})")
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+@dataclass
+class MatchEntry:
+    match: MatchState
+    created_at: str
+    updated_at: str
+    seq: int = 0  # store sequence number the in-memory match reflects
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+
+class MatchRegistry:
+    """In-memory matches backed by a MatchStore, with per-match serialised commands"""
+
+    def __init__(self, store: Optional[MatchStore] = None, feed: Optional[LiveFeed] = None,
+                 index: Optional[MatchIndex] = None, shared: bool = False):
+        if shared and not isinstance(store, SQLiteMatchStore):
+            raise ValueError("Shared mode needs a SQLite match store")
+        self.store = store
+        self.feed = feed
+        self.index = index if index is not None else MatchIndex()
+        self.shared = shared
+        self._entries: Dict[str, MatchEntry] = {}
+        self._lock = threading.Lock()  # guards _entries only
+        self._stamp = 0  # newest store header stamp seen
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if store is not None:
+            headers, self._stamp = store.header_changes(0)
+            for header in headers:
+                self.index.update(MatchHeader(**header))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def create(self, match: MatchState, match_id: Optional[str] = None) -> str:
+        """Register (and persist) a new match, returning its ID"""
+        match_id = match_id or str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        entry = MatchEntry(match, now, now)
+        with self._lock:
+            self._entries[match_id] = entry
+        with entry.lock:
+            self._commit(match_id, entry, None, None)
+        return match_id
+
+    def loaded(self, match_id: str) -> bool:
+        """Whether the match is in memory (get() would not have to recover it)"""
+        with self._lock:
+            return match_id in self._entries
+
+    def get(self, match_id: str) -> Optional[MatchEntry]:
+        """Get a match entry, recovering it from the store if it is not in memory"""
+        with self._lock:
+            entry = self._entries.get(match_id)
+        if entry is not None or self.store is None:
+            return entry
+        # Recovered without holding _lock, so other matches stay available meanwhile
+        match = self.store.load(match_id)
+        if match is None:
+            return None
+        header = self.index.get(match_id)
+        now = datetime.now().isoformat()
+        entry = MatchEntry(match, header.created_at if header else now,
+                           header.updated_at if header else now, self.store.last_seq(match_id))
+        with self._lock:
+            # A concurrent get() of the same match may have got there first
+            return self._entries.setdefault(match_id, entry)
+
+    def _entry(self, match_id: str) -> MatchEntry:
+        entry = self.get(match_id)
+        if entry is None:
+            raise KeyError(f"Match not found: {match_id}")
+        return entry
+
+    def read(self, match_id: str, reader: Callable[[MatchState], Any]) -> Any:
+        """Run reader against a consistent view of the match (no command runs meanwhile)"""
+        entry = self._entry(match_id)
+        with entry.lock:
+            if self.shared:
+                self._sync(match_id, entry)
+            return reader(entry.match)
+
+    def execute(self, match_id: str, command: Callable[[MatchState], Any],
+                expected_version: Optional[int] = None, log_op: Optional[str] = None) -> Tuple[Any, int]:
+        """Apply a command to a match and return (result, new version)
+
+        log_op is 'ball', 'undo' or 'redo' when command returns the BallEvent
+        it added/removed, so only a small log record is written; any other
+        command, or a logged one that returns something else (an undone
+        innings switch), is persisted with a full snapshot.
+
+        A command that raises leaves the match as it was last committed.
+        """
+        entry = self._entry(match_id)
+        with entry.lock:
+            applying = False
+            before = None
+            try:
+                with self.store.exclusive() if self.shared else nullcontext():
+                    if self.shared:
+                        self._sync(match_id, entry)
+                    match = entry.match
+                    if expected_version is not None and expected_version != match.version:
+                        raise StaleVersionError(expected_version, match.version)
+                    if self.store is None:
+                        # Nothing to reload from if the command fails partway
+                        before = match.to_snapshot(undo_history=True)
+                    applying = True
+                    result = command(match)
+                    if log_op and result is None:
+                        # Nothing was scored or undone
+                        return None, match.version
+                    self._commit(match_id, entry, log_op, result)
+                    return result, match.version
+            except BaseException:
+                if applying:
+                    # Outside exclusive(), so a shared store's write has been rolled back
+                    self._restore(match_id, entry, before)
+                raise
+
+    def _restore(self, match_id: str, entry: MatchEntry, snapshot: Optional[Dict[str, Any]]):
+        """Replace a partly changed match with its last committed state (entry lock held)"""
+        if snapshot is not None:
+            entry.match = MatchState.from_snapshot(snapshot)
+            return
+        # If the reload fails too, a shared-mode registry retries it before the next command
+        entry.seq = -1
+        match = self.store.load(match_id)
+        if match is not None:
+            entry.match = match
+            entry.seq = self.store.last_seq(match_id)
+
+    def _sync(self, match_id: str, entry: MatchEntry):
+        """Reload entry from the store if another process has written the match (entry lock held)"""
+        seq = self.store.current_seq(match_id)
+        if seq is None:
+            with self._lock:
+                self._entries.pop(match_id, None)
+            self.index.remove(match_id)
+            raise KeyError(f"Match not found: {match_id}")
+        if seq == entry.seq:
+            return
+        entry.match = self.store.load(match_id)
+        entry.seq = self.store.last_seq(match_id)
+        header = self.index.get(match_id)
+        if header is not None:
+            entry.updated_at = header.updated_at
+        if self.feed is not None:
+            self.feed.publish(match_id, entry.match)
+
+    def _commit(self, match_id: str, entry: MatchEntry, log_op: Optional[str], event: Any):
+        entry.updated_at = datetime.now().isoformat()
+        header = MatchHeader.from_match(match_id, entry.match, entry.created_at, entry.updated_at)
+        self.index.update(header)
+        if self.store is not None:
+            if log_op and isinstance(event, BallEvent):
+                entry.seq = self.store.record(match_id, entry.match, log_op, event)
+            else:
+                entry.seq = self.store.save(match_id, entry.match)
+            self.store.save_header(match_id, header.to_dict())
+        if self.feed is not None:
+            self.feed.publish(match_id, entry.match)
+
+    def delete(self, match_id: str):
+        with self._lock:
+            self._entries.pop(match_id, None)
+        self.index.remove(match_id)
+        if self.store is not None:
+            self.store.delete(match_id)
+        if self.feed is not None:
+            self.feed.close(match_id)
+
+    def poll_changes(self) -> int:
+        """Pick up matches other processes have written since the last poll; returns how many
+
+        Refreshes their listing headers and, for matches with live viewers in
+        this process, reloads them so the viewers receive the change.
+        (Deletions by other processes are noticed when the match is next used.)
+        """
+        headers, self._stamp = self.store.header_changes(self._stamp)
+        for record in headers:
+            header = MatchHeader(**record)
+            self.index.update(header)
+            with self._lock:
+                entry = self._entries.get(header.match_id)
+            if entry is not None and self.feed is not None and self.feed.subscriber_count(header.match_id):
+                with entry.lock:
+                    try:
+                        self._sync(header.match_id, entry)
+                    except KeyError:
+                        pass
+        return len(headers)
+
+    def start_watcher(self, interval: float = 0.25):
+        """Poll the store for other processes' changes in a daemon thread (shared mode)"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.poll_changes()
+                except Exception:
+                    # A busy or briefly locked store: try again on the next tick
+                    continue
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name='cricsmart-store-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,358 @@
+"""
+Persistent match storage for the Cricket Scoring Application
+Matches are saved as periodic snapshots plus a write-ahead log of small
+per-ball records, so a restart or cold start can recover live games.
+A SQLite store can also be shared by several worker processes: every
+write carries a per-match sequence number and every header write a
+store-wide stamp, which other processes poll to notice changes. Reads use
+a connection of their own, so they never queue behind a write that is
+waiting for another process's lock.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import MatchState, BallEvent
+
+# Take a fresh snapshot after this many log records, to bound recovery time
+DEFAULT_SNAPSHOT_EVERY = 60
+
+logger = logging.getLogger(__name__)
+
+
+class MatchStore:
+    """Base class for match persistence backends
+
+    Backends implement the _write_snapshot/_append_log/_read/_delete/
+    list_match_ids primitives; callers use save/record/load.
+    """
+
+    def __init__(self, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()  # re-entrant so exclusive() can wrap save/record
+        self._seq_lock = threading.Lock()  # guards _seqs, which reads update too
+        self._seqs: Dict[str, int] = {}  # match_id -> last written sequence number
+        self._since_snapshot: Dict[str, int] = {}
+
+    def save(self, match_id: str, match: MatchState) -> int:
+        """Write a full snapshot (new match, roster changes, innings switch, ...); returns its seq"""
+        with self._lock:
+            seq = self._next_seq(match_id)
+            self._write_snapshot(match_id, seq, json.dumps(match.to_snapshot(undo_history=True)))
+            self._since_snapshot[match_id] = 0
+            return seq
+
+    def record(self, match_id: str, match: MatchState, op: str, event: Optional[BallEvent] = None) -> int:
+        """Append a log record for a ball, undo or redo already applied to match; returns the last seq written"""
+        record = json.dumps(match.make_log_record(op, event))
+        with self._lock:
+            seq = self._next_seq(match_id)
+            self._append_log(match_id, seq, record)
+            self._since_snapshot[match_id] = self._since_snapshot.get(match_id, 0) + 1
+            if self._since_snapshot[match_id] < self.snapshot_every:
+                return seq
+        return self.save(match_id, match)
+
+    def current_seq(self, match_id: str) -> Optional[int]:
+        """Sequence number of the match's latest write (by any process), or None if it is not stored"""
+        with self._reading():
+            seq = self._current_seq(match_id)
+        if seq is not None:
+            self._note_seq(match_id, seq)
+        return seq
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the store's write lock (across processes, for SQLite) around a read-modify-write"""
+        with self._lock, self._transaction(immediate=True):
+            yield
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False):
+        yield
+
+    def _reading(self):
+        """Context for the read primitives (backends with a separate read path override it)"""
+        return self._lock
+
+    def _note_seq(self, match_id: str, seq: int):
+        with self._seq_lock:
+            self._seqs[match_id] = max(seq, self._seqs.get(match_id, 0))
+
+    def load(self, match_id: str) -> Optional[MatchState]:
+        """Recover a match from its latest snapshot plus the log records after it"""
+        with self._reading():
+            stored = self._read(match_id)
+        if stored is None:
+            return None
+        snapshot, seq, records = stored
+        self._note_seq(match_id, seq)
+        self._since_snapshot[match_id] = len(records)
+        match = MatchState.from_snapshot(json.loads(snapshot))
+        for record in records:
+            match.apply_log_record(json.loads(record))
+        return match
+
+    def save_header(self, match_id: str, header: Dict[str, Any]):
+        """Store the match's listing header (see match_index.MatchHeader), stamping it as the newest change"""
+        with self._lock:
+            self._write_header(match_id, json.dumps(header))
+
+    def load_headers(self) -> List[Dict[str, Any]]:
+        """Listing headers of every stored match, for rebuilding the match index at startup"""
+        return self.header_changes(0)[0]
+
+    def header_changes(self, after_stamp: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Headers written after after_stamp, oldest first, and the newest stamp seen"""
+        with self._reading():
+            rows = self._read_headers(after_stamp)
+        return [json.loads(header) for _, header in rows], rows[-1][0] if rows else after_stamp
+
+    def last_seq(self, match_id: str) -> int:
+        """Sequence number this process last wrote or loaded for the match"""
+        with self._seq_lock:
+            return self._seqs.get(match_id, 0)
+
+    def delete(self, match_id: str):
+        """Remove a match, its log and its header"""
+        with self._lock:
+            self._delete(match_id)
+            with self._seq_lock:
+                self._seqs.pop(match_id, None)
+            self._since_snapshot.pop(match_id, None)
+
+    def _next_seq(self, match_id: str) -> int:
+        # Write lock held, so no other thread is writing this match
+        if match_id not in self._seqs:
+            stored = self._read(match_id)
+            self._note_seq(match_id, stored[1] if stored else 0)
+        with self._seq_lock:
+            self._seqs[match_id] += 1
+            return self._seqs[match_id]
+
+    # Backend primitives
+
+    def list_match_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def _write_snapshot(self, match_id: str, seq: int, data: str):
+        raise NotImplementedError
+
+    def _append_log(self, match_id: str, seq: int, record: str):
+        raise NotImplementedError
+
+    def _read(self, match_id: str) -> Optional[Tuple[str, int, List[str]]]:
+        """Return (snapshot, last seq, log records after the snapshot) or None"""
+        raise NotImplementedError
+
+    def _current_seq(self, match_id: str) -> Optional[int]:
+        stored = self._read(match_id)
+        return stored[1] if stored else None
+
+    def _write_header(self, match_id: str, header: str):
+        raise NotImplementedError
+
+    def _read_headers(self, after_stamp: int) -> List[Tuple[int, str]]:
+        """Return (stamp, header) pairs with stamp > after_stamp, by stamp"""
+        raise NotImplementedError
+
+    def _delete(self, match_id: str):
+        raise NotImplementedError
+
+
+class MemoryMatchStore(MatchStore):
+    """Process-local store (nothing survives a restart); useful for tests and local runs"""
+
+    def __init__(self, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        super().__init__(snapshot_every)
+        self._snapshots: Dict[str, Tuple[int, str]] = {}
+        self._logs: Dict[str, List[Tuple[int, str]]] = {}
+        self._headers: Dict[str, Tuple[int, str]] = {}
+        self._stamp = 0
+
+    def list_match_ids(self) -> List[str]:
+        return list(self._snapshots)
+
+    def _write_snapshot(self, match_id: str, seq: int, data: str):
+        self._snapshots[match_id] = (seq, data)
+        self._logs[match_id] = []
+
+    def _append_log(self, match_id: str, seq: int, record: str):
+        self._logs.setdefault(match_id, []).append((seq, record))
+
+    def _read(self, match_id: str) -> Optional[Tuple[str, int, List[str]]]:
+        if match_id not in self._snapshots:
+            return None
+        seq, data = self._snapshots[match_id]
+        log = self._logs.get(match_id, [])
+        return data, log[-1][0] if log else seq, [record for _, record in log]
+
+    def _write_header(self, match_id: str, header: str):
+        self._stamp += 1
+        self._headers[match_id] = (self._stamp, header)
+
+    def _read_headers(self, after_stamp: int) -> List[Tuple[int, str]]:
+        return sorted(row for row in self._headers.values() if row[0] > after_stamp)
+
+    def _delete(self, match_id: str):
+        self._snapshots.pop(match_id, None)
+        self._logs.pop(match_id, None)
+        self._headers.pop(match_id, None)
+
+
+class SQLiteMatchStore(MatchStore):
+    """SQLite-backed store; the default backend"""
+
+    def __init__(self, path: Optional[str] = None, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        super().__init__(snapshot_every)
+        self.path = path or default_db_path()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # WAL lets this read committed data while another connection holds the write lock
+        self._read_conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._read_lock = threading.Lock()
+        self._local = threading.local()  # .conn: the connection the primitives use on this thread
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                match_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ball_log (
+                match_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (match_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS match_headers (
+                match_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                stamp INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        if 'stamp' not in [row[1] for row in self._conn.execute("PRAGMA table_info(match_headers)")]:
+            self._conn.execute("ALTER TABLE match_headers ADD COLUMN stamp INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS match_headers_stamp ON match_headers (stamp)")
+
+    def close(self):
+        self._conn.close()
+        self._read_conn.close()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        return getattr(self._local, 'conn', None) or self._conn
+
+    @contextmanager
+    def _reading(self):
+        if getattr(self._local, 'writing', False):
+            # Inside this thread's exclusive(): read what it has written
+            yield
+            return
+        with self._read_lock:
+            self._local.conn = self._read_conn
+            try:
+                yield
+            finally:
+                self._local.conn = None
+
+    def list_match_ids(self) -> List[str]:
+        with self._reading():
+            return [row[0] for row in self._db.execute("SELECT match_id FROM snapshots ORDER BY updated_at DESC")]
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False):
+        if self._conn.in_transaction:
+            # Already inside exclusive(); its transaction covers this write
+            yield
+            return
+        self._conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._local.writing = True
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._local.writing = False
+        self._conn.execute("COMMIT")
+
+    def _write_snapshot(self, match_id: str, seq: int, data: str):
+        with self._transaction():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (match_id, seq, data, updated_at) VALUES (?, ?, ?, ?)",
+                (match_id, seq, data, time.time())
+            )
+            self._conn.execute("DELETE FROM ball_log WHERE match_id = ? AND seq <= ?", (match_id, seq))
+
+    def _append_log(self, match_id: str, seq: int, record: str):
+        self._conn.execute("INSERT INTO ball_log (match_id, seq, record) VALUES (?, ?, ?)", (match_id, seq, record))
+
+    def _read(self, match_id: str) -> Optional[Tuple[str, int, List[str]]]:
+        row = self._db.execute("SELECT seq, data FROM snapshots WHERE match_id = ?", (match_id,)).fetchone()
+        if row is None:
+            return None
+        seq, data = row
+        log = self._db.execute(
+            "SELECT seq, record FROM ball_log WHERE match_id = ? AND seq > ? ORDER BY seq", (match_id, seq)
+        ).fetchall()
+        return data, log[-1][0] if log else seq, [record for _, record in log]
+
+    def _current_seq(self, match_id: str) -> Optional[int]:
+        return self._db.execute(
+            "SELECT MAX(seq) FROM (SELECT seq FROM snapshots WHERE match_id = ? "
+            "UNION ALL SELECT MAX(seq) FROM ball_log WHERE match_id = ?)", (match_id, match_id)
+        ).fetchone()[0]
+
+    def _write_header(self, match_id: str, header: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO match_headers (match_id, data, stamp) "
+            "VALUES (?, ?, (SELECT COALESCE(MAX(stamp), 0) + 1 FROM match_headers))", (match_id, header)
+        )
+
+    def _read_headers(self, after_stamp: int) -> List[Tuple[int, str]]:
+        return self._db.execute(
+            "SELECT stamp, data FROM match_headers WHERE stamp > ? ORDER BY stamp", (after_stamp,)
+        ).fetchall()
+
+    def _delete(self, match_id: str):
+        with self._transaction():
+            self._conn.execute("DELETE FROM snapshots WHERE match_id = ?", (match_id,))
+            self._conn.execute("DELETE FROM ball_log WHERE match_id = ?", (match_id,))
+            self._conn.execute("DELETE FROM match_headers WHERE match_id = ?", (match_id,))
+
+
+def default_db_path() -> str:
+    """SQLite file location: CRICSMART_DB_PATH, else a file in the temp dir
+
+    The temp dir is the only writable place on Vercel, but there it belongs
+    to one function instance and is wiped when the instance is recycled, so
+    stored matches survive warm restarts only, and are not shared between
+    instances. A warning is logged when the default is used there.
+    """
+    path = os.environ.get('CRICSMART_DB_PATH')
+    if path:
+        return path
+    path = os.path.join(tempfile.gettempdir(), 'cricsmart_matches.db')
+    if os.environ.get('VERCEL'):
+        logger.warning("CRICSMART_DB_PATH is not set: matches are stored in %s, which is lost when this "
+                       "instance is recycled and is not shared with other instances", path)
+    return path
+
+
+def create_store(backend: Optional[str] = None, **options: Any) -> MatchStore:
+    """Create the configured store backend (CRICSMART_STORE=sqlite|memory, default sqlite)"""
+    backend = backend or os.environ.get('CRICSMART_STORE', 'sqlite')
+    if backend == 'sqlite':
+        return SQLiteMatchStore(**options)
+    if backend == 'memory':
+        return MemoryMatchStore(**options)
+    raise ValueError(f"Unknown match store backend: {backend}")
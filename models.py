@@ -4,9 +4,18 @@ Contains Player, Team, MatchState classes and related enums
 """
 
 from enum import Enum
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple, Iterator, Union
+from dataclasses import dataclass, field, fields, asdict, astuple, replace
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Sequence
+import heapq
 import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 
 class PlayerRole(Enum):
@@ -26,36 +35,103 @@ class WicketType(Enum):
     RETIRED = "Retired"
 
 
+def _rate(numerator: int, denominator: int, scale: int = 1) -> float:
+    """numerator / denominator * scale to 2 places (0.0 when denominator is 0)"""
+    if denominator <= 0:
+        return 0.0
+    return round(numerator * scale / denominator, 2)
+
+
+def _known_fields(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+    names = {f.name for f in fields(cls)}
+    return {key: value for key, value in data.items() if key in names}
+
+
 @dataclass
 class BattingStats:
+    """Integer counts; the rates are derived from them on read"""
     runs: int = 0
     balls: int = 0
     fours: int = 0
     sixes: int = 0
-    strike_rate: float = 0.0
-    
-    def update_strike_rate(self):
-        if self.balls > 0:
-            self.strike_rate = round((self.runs / self.balls) * 100, 2)
+    dots: int = 0  # balls faced without a run off the bat
+
+    @property
+    def strike_rate(self) -> float:
+        return _rate(self.runs, self.balls, 100)
+
+    @property
+    def dot_ball_percentage(self) -> float:
+        return _rate(self.dots, self.balls, 100)
+
+    @property
+    def boundary_percentage(self) -> float:
+        """Share of balls faced hit for four or six"""
+        return _rate(self.fours + self.sixes, self.balls, 100)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Counts plus derived rates (for API responses)"""
+        return {**asdict(self), 'strike_rate': self.strike_rate, 'dot_ball_percentage': self.dot_ball_percentage,
+                'boundary_percentage': self.boundary_percentage}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BattingStats':
+        """Build from asdict()/to_dict() output, including records that stored strike_rate"""
+        return cls(**_known_fields(cls, data))
 
 
 @dataclass
 class BowlingStats:
-    overs: float = 0.0
+    """Integer counts (balls are legal deliveries); overs and the rates are derived from them on read"""
+    balls: int = 0
     runs: int = 0
     wickets: int = 0
-    economy: float = 0.0
     wides: int = 0
     no_balls: int = 0
-    
-    def update_economy(self):
-        if self.overs > 0:
-            self.economy = round(self.runs / self.overs, 2)
-    
+    dots: int = 0  # legal balls with no runs charged to the bowler
+
+    @property
+    def overs(self) -> float:
+        """Overs in cricket notation (3.5 = 3 overs and 5 balls)"""
+        return self.balls // 6 + self.balls % 6 / 10
+
+    @overs.setter
+    def overs(self, value: float):
+        self.balls = overs_to_balls(value)
+
+    @property
+    def economy(self) -> float:
+        """Runs per six legal balls"""
+        return _rate(self.runs, self.balls, 6)
+
+    @property
+    def average(self) -> float:
+        return _rate(self.runs, self.wickets)
+
+    @property
+    def strike_rate(self) -> float:
+        """Balls per wicket"""
+        return _rate(self.balls, self.wickets)
+
+    @property
+    def dot_ball_percentage(self) -> float:
+        return _rate(self.dots, self.balls, 100)
+
     def get_average(self) -> float:
-        if self.wickets > 0:
-            return round(self.runs / self.wickets, 2)
-        return 0.0
+        return self.average
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Counts plus overs and derived rates (for API responses)"""
+        return {**asdict(self), 'overs': self.overs, 'economy': self.economy, 'average': self.average,
+                'strike_rate': self.strike_rate, 'dot_ball_percentage': self.dot_ball_percentage}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BowlingStats':
+        """Build from asdict()/to_dict() output, including records that stored overs as a float"""
+        stats = cls(**_known_fields(cls, data))
+        if 'balls' not in data and 'overs' in data:
+            stats.overs = data['overs']
+        return stats
 
 
 @dataclass
@@ -71,24 +147,35 @@ class Player:
             'id': self.id,
             'name': self.name,
             'role': self.role.value,
-            'batting_stats': {
-                'runs': self.batting_stats.runs,
-                'balls': self.batting_stats.balls,
-                'fours': self.batting_stats.fours,
-                'sixes': self.batting_stats.sixes,
-                'strike_rate': self.batting_stats.strike_rate
-            },
-            'bowling_stats': {
-                'overs': self.bowling_stats.overs,
-                'runs': self.bowling_stats.runs,
-                'wickets': self.bowling_stats.wickets,
-                'economy': self.bowling_stats.economy,
-                'wides': self.bowling_stats.wides,
-                'no_balls': self.bowling_stats.no_balls,
-                'average': self.bowling_stats.get_average()
-            }
+            'batting_stats': self.batting_stats.to_dict(),
+            'bowling_stats': self.bowling_stats.to_dict()
         }
 
+    def to_record(self) -> Dict[str, Any]:
+        """Lossless dict form of the player (for snapshots and logs)"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'role': self.role.value,
+            'batting_stats': asdict(self.batting_stats),
+            'bowling_stats': asdict(self.bowling_stats)
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'Player':
+        return cls(
+            id=record['id'],
+            name=record['name'],
+            role=PlayerRole(record['role']),
+            batting_stats=BattingStats.from_dict(record['batting_stats']),
+            bowling_stats=BowlingStats.from_dict(record['bowling_stats'])
+        )
+
+
+def normalize_player_name(name: str) -> str:
+    """Normalize a player name for lookups (case and whitespace insensitive)"""
+    return " ".join(name.split()).casefold()
+
 
 @dataclass
 class Team:
@@ -97,18 +184,73 @@ class Team:
     batting_order: List[str] = field(default_factory=list)  # Player IDs who batted
     bowling_order: List[str] = field(default_factory=list)  # Player IDs who bowled
     captain_id: Optional[str] = None  # Player ID of captain
-    
+
+    # Lookup indexes over players, maintained by add/remove/rename
+    _players_by_id: Dict[str, Player] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _players_by_name: Dict[str, Player] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    # Bumped on every roster change, so values derived from the roster can be cached
+    roster_version: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild the player indexes (needed only if players was modified directly)"""
+        self.roster_version += 1
+        self._players_by_id = {}
+        self._players_by_name = {}
+        for player in self.players:
+            self._players_by_id.setdefault(player.id, player)
+            self._players_by_name.setdefault(normalize_player_name(player.name), player)
+
     def add_player(self, player: Player):
         """Add a new player to the team"""
-        if player.id not in [p.id for p in self.players]:
+        if player.id not in self._players_by_id:
+            self.roster_version += 1
             self.players.append(player)
-    
+            self._players_by_id[player.id] = player
+            self._players_by_name.setdefault(normalize_player_name(player.name), player)
+
+    def remove_player(self, player_id: str) -> Optional[Player]:
+        """Remove a player from the team and return it"""
+        player = self._players_by_id.pop(player_id, None)
+        if player is None:
+            return None
+        self.roster_version += 1
+        self.players.remove(player)
+        self._unindex_name(player)
+        if self.captain_id == player_id:
+            self.captain_id = None
+        return player
+
+    def rename_player(self, player_id: str, name: str):
+        """Change a player's name, keeping the name index in step"""
+        player = self._players_by_id.get(player_id)
+        if player is None:
+            raise ValueError("Player not found in team")
+        self.roster_version += 1
+        self._unindex_name(player)
+        player.name = name
+        self._players_by_name.setdefault(normalize_player_name(name), player)
+
+    def _unindex_name(self, player: Player):
+        key = normalize_player_name(player.name)
+        if self._players_by_name.get(key) is player:
+            del self._players_by_name[key]
+            # Fall back to another player sharing the same name, if any
+            for other in self.players:
+                if other is not player and normalize_player_name(other.name) == key:
+                    self._players_by_name[key] = other
+                    break
+
     def get_player_by_id(self, player_id: str) -> Optional[Player]:
         """Get player by ID"""
-        for player in self.players:
-            if player.id == player_id:
-                return player
-        return None
+        return self._players_by_id.get(player_id)
+
+    def get_player_by_name(self, name: str) -> Optional[Player]:
+        """Get player by name (case and whitespace insensitive)"""
+        return self._players_by_name.get(normalize_player_name(name))
     
     def get_players_not_batted(self) -> List[Player]:
         """Get players who haven't batted yet"""
@@ -121,11 +263,11 @@ class Team:
     
     def get_top_batsmen(self, limit: int = 5) -> List[Player]:
         """Get top batsmen by runs scored"""
-        return sorted(self.players, key=lambda p: p.batting_stats.runs, reverse=True)[:limit]
+        return heapq.nlargest(limit, self.players, key=lambda p: p.batting_stats.runs)
     
     def get_top_bowlers(self, limit: int = 5) -> List[Player]:
         """Get top bowlers by wickets taken"""
-        return sorted(self.players, key=lambda p: p.bowling_stats.wickets, reverse=True)[:limit]
+        return heapq.nlargest(limit, self.players, key=lambda p: p.bowling_stats.wickets)
     
     def get_captain(self) -> Optional[Player]:
         """Get the captain of the team"""
@@ -140,6 +282,26 @@ class Team:
         else:
             raise ValueError("Player not found in team")
 
+    def to_record(self) -> Dict[str, Any]:
+        """Lossless dict form of the team (for snapshots)"""
+        return {
+            'team_name': self.team_name,
+            'players': [player.to_record() for player in self.players],
+            'batting_order': list(self.batting_order),
+            'bowling_order': list(self.bowling_order),
+            'captain_id': self.captain_id
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'Team':
+        return cls(
+            team_name=record['team_name'],
+            players=[Player.from_record(player) for player in record['players']],
+            batting_order=list(record['batting_order']),
+            bowling_order=list(record['bowling_order']),
+            captain_id=record['captain_id']
+        )
+
 
 @dataclass
 class BallEvent:
@@ -167,6 +329,386 @@ class BallEvent:
             'comment': self.comment
         }
 
+    def to_record(self) -> Dict[str, Any]:
+        """Lossless, compact dict form of the event (unset optional fields are omitted)"""
+        record = {'ball_number': self.ball_number, 'over_number': self.over_number, 'runs': self.runs}
+        if self.is_wicket:
+            record['is_wicket'] = True
+        if self.wicket_type is not None:
+            record['wicket_type'] = self.wicket_type.value
+        for name in ('batsman_id', 'bowler_id', 'catcher_id', 'runout_by', 'extra_type'):
+            value = getattr(self, name)
+            if value is not None:
+                record[name] = value
+        if self.description:
+            record['description'] = self.description
+        if self.comment:
+            record['comment'] = self.comment
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'BallEvent':
+        record = dict(record)
+        if record.get('wicket_type') is not None:
+            record['wicket_type'] = WicketType(record['wicket_type'])
+        return cls(**record)
+
+
+class BallEventLog(Sequence):
+    """Compact, column-oriented store of BallEvents for one innings
+
+    Numeric fields live in array buffers, player IDs are interned to small
+    ints and extra and wicket types are kept as indexes into fixed tables,
+    so a delivery costs a few bytes instead of a full dataclass instance.
+    Indexing and iteration return BallEvent objects rebuilt from the
+    columns; they are copies, so changing them does not change the log.
+    """
+
+    _WICKET_TYPES = list(WicketType)
+    _EXTRA_TYPES = ("wide", "no-ball", "bye", "leg-bye", "dead-ball")
+
+    def __init__(self, events=()):
+        self._ball = array('h')
+        self._over = array('h')
+        self._runs = array('h')
+        self._wicket = array('b')  # -1 not out, 0 wicket without type, n = WicketType index + 1
+        self._extra = array('b')  # -1 none, otherwise index into _EXTRA_TYPES
+        self._batsman = array('h')  # -1 none, otherwise index into _strings
+        self._bowler = array('h')
+        self._catcher = array('h')
+        # Rarely-set fields are stored sparsely by position
+        self._runout_by: Dict[int, tuple] = {}
+        self._description: Dict[int, str] = {}
+        self._comment: Dict[int, str] = {}
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        for event in events:
+            self.append(event)
+
+    def _intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._string_codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._string_codes[value] = code
+        return code
+
+    def _lookup(self, code: int) -> Optional[str]:
+        return None if code < 0 else self._strings[code]
+
+    def append(self, event: BallEvent):
+        """Append a delivery to the log"""
+        index = len(self._ball)
+        self._ball.append(event.ball_number)
+        self._over.append(event.over_number)
+        self._runs.append(event.runs)
+        if not event.is_wicket:
+            self._wicket.append(-1)
+        elif event.wicket_type is None:
+            self._wicket.append(0)
+        else:
+            self._wicket.append(self._WICKET_TYPES.index(event.wicket_type) + 1)
+        self._extra.append(-1 if event.extra_type is None else self._EXTRA_TYPES.index(event.extra_type))
+        self._batsman.append(self._intern(event.batsman_id))
+        self._bowler.append(self._intern(event.bowler_id))
+        self._catcher.append(self._intern(event.catcher_id))
+        if event.runout_by is not None:
+            self._runout_by[index] = tuple(self._intern(player_id) for player_id in event.runout_by)
+        if event.description:
+            self._description[index] = event.description
+        if event.comment:
+            self._comment[index] = event.comment
+
+    def over_bounds(self, start_over: int, stop_over: int) -> Tuple[int, int]:
+        """Index range of the deliveries in overs start_over..stop_over-1 (overs are in order)"""
+        return bisect_left(self._over, start_over), bisect_left(self._over, stop_over)
+
+    def pop(self) -> BallEvent:
+        """Remove and return the last delivery"""
+        if not self._ball:
+            raise IndexError("pop from empty BallEventLog")
+        index = len(self._ball) - 1
+        event = self._event_at(index)
+        for column in (self._ball, self._over, self._runs, self._wicket, self._extra,
+                       self._batsman, self._bowler, self._catcher):
+            column.pop()
+        self._runout_by.pop(index, None)
+        self._description.pop(index, None)
+        self._comment.pop(index, None)
+        return event
+
+    def clear(self):
+        """Remove all deliveries"""
+        self.__init__()
+
+    def _event_at(self, index: int) -> BallEvent:
+        wicket = self._wicket[index]
+        runout_by = self._runout_by.get(index)
+        return BallEvent(
+            ball_number=self._ball[index],
+            over_number=self._over[index],
+            runs=self._runs[index],
+            is_wicket=wicket >= 0,
+            wicket_type=self._WICKET_TYPES[wicket - 1] if wicket > 0 else None,
+            batsman_id=self._lookup(self._batsman[index]),
+            bowler_id=self._lookup(self._bowler[index]),
+            catcher_id=self._lookup(self._catcher[index]),
+            runout_by=[self._strings[code] for code in runout_by] if runout_by is not None else None,
+            extra_type=self._EXTRA_TYPES[self._extra[index]] if self._extra[index] >= 0 else None,
+            description=self._description.get(index, ""),
+            comment=self._comment.get(index, "")
+        )
+
+    def __len__(self) -> int:
+        return len(self._ball)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._event_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("BallEventLog index out of range")
+        return self._event_at(index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (BallEventLog, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BallEventLog({len(self)} events)"
+
+
+# Bumped whenever the MatchState.to_snapshot() layout changes
+SNAPSHOT_FORMAT = 1
+
+# Number of recent changes MatchState keeps for diff(); older clients get a snapshot
+CHANGE_HISTORY = 300
+
+DEFAULT_UNDO_DEPTH = 120
+
+
+def _undo_depth() -> int:
+    """CRICSMART_UNDO_DEPTH, at least 1; a value that is not a whole number falls back to the default"""
+    value = os.environ.get('CRICSMART_UNDO_DEPTH')
+    if not value:
+        return DEFAULT_UNDO_DEPTH
+    try:
+        depth = int(value)
+    except ValueError:
+        logger.warning("Ignoring CRICSMART_UNDO_DEPTH=%r (not a whole number); using %d", value, DEFAULT_UNDO_DEPTH)
+        return DEFAULT_UNDO_DEPTH
+    if depth < 1:
+        logger.warning("CRICSMART_UNDO_DEPTH=%d is below 1; using 1", depth)
+    return max(depth, 1)
+
+
+# Scoring commands (balls and innings switches) MatchState can undo (CRICSMART_UNDO_DEPTH)
+UNDO_DEPTH = _undo_depth()
+
+
+# Extras that do not count as a legal delivery / that carry a one-run penalty
+NON_LEGAL_EXTRAS = ("wide", "no-ball", "dead-ball")
+PENALTY_EXTRAS = ("wide", "no-ball")
+
+
+def overs_to_balls(overs: float) -> int:
+    """Convert overs in cricket notation (3.5 = 3 overs and 5 balls) to balls"""
+    return int(overs) * 6 + round((overs - int(overs)) * 10)
+
+
+def event_total_runs(event: BallEvent) -> int:
+    """Runs a delivery adds to the team total (penalty run included for wides/no-balls)"""
+    if event.extra_type in PENALTY_EXTRAS:
+        return event.runs + 1
+    return event.runs
+
+
+@dataclass
+class InningsTally:
+    """Running aggregates for the current innings, kept in step with MatchState.events"""
+    runs: int = 0
+    wickets: int = 0
+    legal_balls: int = 0
+    wides: int = 0
+    no_balls: int = 0
+    byes: int = 0
+    leg_byes: int = 0
+    partnership_runs: int = 0
+    partnership_balls: int = 0
+    fall_of_wickets: List[Dict[str, Any]] = field(default_factory=list)
+    overs: Dict[int, Dict[str, int]] = field(default_factory=dict)  # over_number -> tallies
+
+    @classmethod
+    def from_events(cls, events) -> 'InningsTally':
+        """Rebuild the tallies from scratch by replaying an event list"""
+        tally = cls()
+        for event in events:
+            tally.apply(event)
+        return tally
+
+    @property
+    def extras(self) -> int:
+        return self.wides + self.no_balls + self.byes + self.leg_byes
+
+    def apply(self, event: BallEvent):
+        """Add a delivery to the running tallies"""
+        runs = event_total_runs(event)
+        legal = event.extra_type not in NON_LEGAL_EXTRAS
+
+        self.runs += runs
+        self._count_extra(event, 1)
+
+        over = self.overs.setdefault(event.over_number, {'runs': 0, 'wickets': 0, 'balls': 0, 'deliveries': 0})
+        over['runs'] += runs
+        over['deliveries'] += 1
+        if legal:
+            self.legal_balls += 1
+            over['balls'] += 1
+
+        self.partnership_runs += runs
+        if legal:
+            self.partnership_balls += 1
+
+        if event.is_wicket:
+            self.wickets += 1
+            over['wickets'] += 1
+            # Record the partnership that ended so undo can restore it exactly
+            self.fall_of_wickets.append({
+                'wicket': self.wickets,
+                'runs': self.runs,
+                'over': f"{event.over_number}.{event.ball_number}",
+                'batsman_id': event.batsman_id,
+                'partnership_runs': self.partnership_runs,
+                'partnership_balls': self.partnership_balls
+            })
+            self.partnership_runs = 0
+            self.partnership_balls = 0
+
+    def revert(self, event: BallEvent):
+        """Exactly reverse a previous apply() of the same (last) delivery"""
+        runs = event_total_runs(event)
+        legal = event.extra_type not in NON_LEGAL_EXTRAS
+        over = self.overs[event.over_number]
+
+        if event.is_wicket:
+            fall = self.fall_of_wickets.pop()
+            self.partnership_runs = fall['partnership_runs']
+            self.partnership_balls = fall['partnership_balls']
+            self.wickets -= 1
+            over['wickets'] -= 1
+
+        self.partnership_runs -= runs
+        if legal:
+            self.partnership_balls -= 1
+            self.legal_balls -= 1
+            over['balls'] -= 1
+
+        over['runs'] -= runs
+        over['deliveries'] -= 1
+        if over['deliveries'] == 0:
+            del self.overs[event.over_number]
+
+        self._count_extra(event, -1)
+        self.runs -= runs
+
+    def _count_extra(self, event: BallEvent, sign: int):
+        if event.extra_type == "wide":
+            self.wides += sign
+        elif event.extra_type == "no-ball":
+            self.no_balls += sign
+        elif event.extra_type == "bye":
+            self.byes += sign * event.runs
+        elif event.extra_type == "leg-bye":
+            self.leg_byes += sign * event.runs
+
+
+@dataclass(frozen=True)
+class BallSide:
+    """Scoreboard just before one scored ball, or just before it was undone, as undo/redo restore it"""
+    striker_id: Optional[str]
+    non_striker_id: Optional[str]
+    bowler_id: Optional[str]
+    current_over: int
+    current_ball: int
+    total_runs: int
+    wickets: int
+    batted: int  # length of the batting order
+    bowled: int  # length of the bowling order
+    batting: BattingStats  # the ball's batsman's stats
+    bowling: BowlingStats  # the ball's bowler's stats
+
+    def to_record(self) -> List[Any]:
+        """Compact list form: the fields in order, with the stats as lists of their counts"""
+        return [self.striker_id, self.non_striker_id, self.bowler_id, self.current_over, self.current_ball,
+                self.total_runs, self.wickets, self.batted, self.bowled,
+                list(astuple(self.batting)), list(astuple(self.bowling))]
+
+    @classmethod
+    def from_record(cls, record: List[Any]) -> 'BallSide':
+        *scoreboard, batting, bowling = record
+        return cls(*scoreboard, BattingStats(*batting), BowlingStats(*bowling))
+
+
+@dataclass(frozen=True)
+class BallDelta:
+    """Undo/redo record of one scored ball"""
+    event: BallEvent
+    before: BallSide
+    incoming_id: Optional[str]  # batsman who came in after a wicket
+    after: Optional[BallSide] = None  # set when the ball is undone, for redo
+
+    def to_record(self) -> Dict[str, Any]:
+        record = {'event': self.event.to_record(), 'before': self.before.to_record(), 'incoming_id': self.incoming_id}
+        if self.after is not None:
+            record['after'] = self.after.to_record()
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'BallDelta':
+        return cls(BallEvent.from_record(record['event']), BallSide.from_record(record['before']),
+                   record['incoming_id'], BallSide.from_record(record['after']) if 'after' in record else None)
+
+
+@dataclass(frozen=True)
+class SwitchDelta:
+    """What switch_innings() replaced, to put it back on undo (the ball log and tally are moved, not copied)"""
+    striker_id: Optional[str]
+    non_striker_id: Optional[str]
+    bowler_id: Optional[str]
+    current_over: int
+    current_ball: int
+    total_runs: int
+    wickets: int
+    first_innings_summary: Optional[Dict[str, Any]]
+    tally: InningsTally
+    orders: Tuple[Tuple[int, int], ...]  # batting and bowling order lengths of team_a, team_b
+
+    def to_record(self) -> Dict[str, Any]:
+        """Dict form without the tally, which is rebuilt from the finished innings' ball log"""
+        record = {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'tally'}
+        record['orders'] = [list(lengths) for lengths in self.orders]
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], tally: InningsTally) -> 'SwitchDelta':
+        return cls(**{**record, 'tally': tally, 'orders': tuple(tuple(lengths) for lengths in record['orders'])})
+
+
+@dataclass(frozen=True)
+class MatchStatus:
+    """Completion state derived from a MatchState, computed once per state (see MatchState.get_status)"""
+    overs_complete: bool
+    all_out: bool
+    target: Optional[int]  # runs the second innings needs, once the first innings is in
+    target_achieved: bool
+    innings_complete: bool
+    match_complete: bool
+    winner: Optional[str]
+
 
 @dataclass
 class MatchState:
@@ -195,17 +737,118 @@ class MatchState:
     overs_completed: float = 0.0
     
     # Events history for undo functionality
-    events: List[BallEvent] = field(default_factory=list)
-    
+    events: BallEventLog = field(default_factory=BallEventLog)
+
+    # Ball logs of finished innings (innings -> events), never changed after switch_innings
+    innings_events: Dict[int, BallEventLog] = field(default_factory=dict)
+
+    # Running innings aggregates (extras, partnership, fall of wickets, per-over)
+    tally: InningsTally = field(default_factory=InningsTally)
+
+    # Per-over tallies of finished innings, built on first request (their logs never change)
+    _innings_overs: Dict[int, Dict[int, Dict[str, int]]] = field(default_factory=dict, repr=False, compare=False)
+
+    # Dismissals per innings: innings -> batsman_id -> dismissal details by player ID
+    dismissals: Dict[int, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+    # State version, bumped on every change; recent changes are kept for diff()
+    version: int = 0
+    _changes: deque = field(default_factory=lambda: deque(maxlen=CHANGE_HISTORY), repr=False, compare=False)
+    _changes_base: int = field(default=0, repr=False, compare=False)  # oldest version diff() can start from
+
+    # Inverse deltas of the last scoring commands (BallDelta/SwitchDelta), newest last, for undo()/redo()
+    _undo_stack: deque = field(default_factory=lambda: deque(maxlen=UNDO_DEPTH), repr=False, compare=False)
+    _redo_stack: deque = field(default_factory=lambda: deque(maxlen=UNDO_DEPTH), repr=False, compare=False)
+
+    # (state key, value) of the last get_status()/get_match_result() computation
+    _status_cache: Optional[Tuple[Tuple, MatchStatus]] = field(default=None, repr=False, compare=False)
+    _result_cache: Optional[Tuple[Tuple, Any]] = field(default=None, repr=False, compare=False)
+
     def add_event(self, event: BallEvent):
         """Add a ball event to history"""
         self.events.append(event)
-    
+        self.tally.apply(event)
+        self._index_dismissal(self.current_innings, event)
+        self._record_change('ball', event)
+
     def undo_last_event(self) -> Optional[BallEvent]:
         """Remove and return the last event"""
         if self.events:
-            return self.events.pop()
+            event = self.events.pop()
+            self.tally.revert(event)
+            if event.is_wicket and event.batsman_id:
+                innings_dismissals = self.dismissals.get(self.current_innings, {})
+                innings_dismissals.pop(event.batsman_id, None)
+                if not innings_dismissals:
+                    self.dismissals.pop(self.current_innings, None)
+            self._record_change('undo', event)
+            return event
         return None
+
+    def clear_history(self):
+        """Forget everything that could be undone or redone"""
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+
+    def mark_changed(self, structural: bool = False):
+        """Bump the version after a change made outside add_event/undo_last_event
+
+        Use structural=True for changes a delta cannot describe (rosters,
+        innings switch), so clients behind this version get a full snapshot.
+        Anything undone can no longer be redone after such a change.
+        """
+        self._redo_stack.clear()
+        if structural:
+            self._mark_structural()
+        else:
+            self._record_change('state')
+
+    def _mark_structural(self):
+        self.version += 1
+        self._changes.clear()
+        self._changes_base = self.version
+
+    def _record_change(self, op: str, event: Optional[BallEvent] = None):
+        self.version += 1
+        self._changes.append((self.version, op, event.to_record() if event else None))
+
+    def diff(self, since_version: int) -> Dict[str, Any]:
+        """Get what changed after since_version: ball/undo ops plus current scoreboard and touched players
+
+        Falls back to a snapshot (without the ball logs) when since_version is too old or unknown.
+        """
+        oldest = self._changes[0][0] - 1 if self._changes else self.version
+        if since_version > self.version or since_version < max(oldest, self._changes_base):
+            return {'version': self.version, 'snapshot': self.to_snapshot(ball_logs=False)}
+
+        ops = []
+        player_ids = set()
+        for version, op, event in self._changes:
+            if version <= since_version:
+                continue
+            ops.append({'op': op, 'event': event} if event else {'op': op})
+            if event:
+                player_ids.update(event.get(key) for key in ('batsman_id', 'bowler_id', 'catcher_id'))
+        if not ops:
+            return {'version': self.version, 'since': since_version, 'ops': []}
+
+        player_ids.update(player.id for player in (self.striker, self.non_striker, self.current_bowler) if player)
+        players = {}
+        for player_id in player_ids:
+            player = self.get_player_by_id(player_id) if player_id else None
+            if player:
+                players[player_id] = [player.batting_stats.to_dict(), player.bowling_stats.to_dict()]
+        return {
+            'version': self.version,
+            'since': since_version,
+            'ops': ops,
+            'scoreboard': self._scoreboard_record(),
+            'players': players
+        }
+
+    def verify_tallies(self) -> bool:
+        """Check the running tallies against a full rebuild from events"""
+        return InningsTally.from_events(self.events) == self.tally
     
     def get_match_summary(self) -> Dict[str, Any]:
         """Get current match summary"""
@@ -224,24 +867,8 @@ class MatchState:
 
     def get_innings_summary(self) -> Dict[str, Any]:
         """Get summary for completed innings"""
-        # Calculate extras
-        wides = 0
-        no_balls = 0
-        byes = 0
-        leg_byes = 0
-        
-        for event in self.events:
-            if event.extra_type == "wide":
-                wides += 1
-            elif event.extra_type == "no-ball":
-                no_balls += 1
-            elif event.extra_type == "bye":
-                byes += event.runs
-            elif event.extra_type == "leg-bye":
-                leg_byes += event.runs
-        
-        extras = wides + no_balls + byes + leg_byes
-        
+        tally = self.tally
+
         return {
             'team': self.batting_team.team_name if self.batting_team else None,
             'runs': self.total_runs,
@@ -249,99 +876,195 @@ class MatchState:
             'overs': f"{self.current_over}.{self.current_ball}",
             'max_overs': self.max_overs,
             'extras': {
-                'total': extras,
-                'wides': wides,
-                'no_balls': no_balls,
-                'byes': byes,
-                'leg_byes': leg_byes
-            }
+                'total': tally.extras,
+                'wides': tally.wides,
+                'no_balls': tally.no_balls,
+                'byes': tally.byes,
+                'leg_byes': tally.leg_byes
+            },
+            'partnership': {
+                'runs': tally.partnership_runs,
+                'balls': tally.partnership_balls
+            },
+            'fall_of_wickets': [
+                {k: v for k, v in fall.items() if not k.startswith('partnership')}
+                for fall in tally.fall_of_wickets
+            ]
         }
 
-    def is_innings_complete(self) -> bool:
-        """Check if innings is complete (all overs bowled, all wickets fallen, or target achieved)"""
-        if self.max_overs is None:
-            return False
-        
-        # Check if all overs bowled
-        overs_complete = self.current_over >= self.max_overs and self.current_ball == 0
-        
-        # Check if all wickets fallen
-        all_out = self.batting_team and len(self.batting_team.batting_order) >= len(self.batting_team.players) and self.wickets >= len(self.batting_team.players) - 1
-        
-        # Check if target achieved (second innings only)
+    def get_over_tallies(self, innings: Optional[int] = None) -> Dict[int, Dict[str, int]]:
+        """Get runs, wickets and balls for each over of an innings (default: the current one)"""
+        if innings is None or innings == self.current_innings:
+            overs = self.tally.overs
+        else:
+            overs = self._innings_overs.get(innings)
+            if overs is None:
+                overs = self._innings_overs[innings] = InningsTally.from_events(self._innings_log(innings)).overs
+        return {over: dict(tally) for over, tally in overs.items()}
+
+    def _innings_log(self, innings: Optional[int] = None) -> BallEventLog:
+        if innings is None or innings == self.current_innings:
+            return self.events
+        if innings not in self.innings_events:
+            raise ValueError(f"No balls recorded for innings {innings}")
+        return self.innings_events[innings]
+
+    def iter_balls(self, over_range: Optional[range] = None, innings: Optional[int] = None) -> Iterator[BallEvent]:
+        """Yield the deliveries of an innings (default: current), optionally only those in over_range
+
+        over_range is a range of 0-based over numbers, e.g. range(5, 10).
+        """
+        log = self._innings_log(innings)
+        start, stop = (0, len(log)) if over_range is None else log.over_bounds(over_range.start, over_range.stop)
+        for index in range(start, stop):
+            yield log[index]
+
+    def get_balls_page(self, after: int = -1, limit: int = 60, innings: Optional[int] = None) -> Dict[str, Any]:
+        """Get up to limit deliveries after ball index `after`, with the cursor for the next page"""
+        log = self._innings_log(innings)
+        start = max(after + 1, 0)
+        stop = min(start + limit, len(log))
+        balls = []
+        for index in range(start, stop):
+            ball = log[index].to_dict()
+            ball['index'] = index
+            balls.append(ball)
+        return {
+            'innings': innings or self.current_innings,
+            'balls': balls,
+            'next': stop - 1 if stop < len(log) else None,
+            'total': len(log)
+        }
+
+    def _status_key(self) -> Tuple:
+        """Everything the derived status depends on; the version covers events, innings and stats"""
+        first_runs = self.first_innings_summary["runs"] if self.first_innings_summary else None
+        batting = self.batting_team
+        return (self.version, self.current_innings, self.total_runs, self.wickets, self.current_over,
+                self.current_ball, self.max_overs, first_runs, id(batting),
+                batting.roster_version if batting else None, len(batting.batting_order) if batting else None)
+
+    def get_status(self) -> MatchStatus:
+        """Get innings/match completion and the winner, recomputed only when the state has changed"""
+        key = self._status_key()
+        if self._status_cache is not None and self._status_cache[0] == key:
+            return self._status_cache[1]
+
+        # All overs bowled
+        overs_complete = self.max_overs is not None and self.current_over >= self.max_overs and self.current_ball == 0
+
+        # All wickets fallen
+        batting = self.batting_team
+        squad = len(batting.players) if batting else 0
+        all_out = bool(batting) and len(batting.batting_order) >= squad and self.wickets >= squad - 1
+
+        # Target achieved (second innings only)
+        target = None
         target_achieved = False
         if self.current_innings == 2 and self.first_innings_summary:
             target = self.first_innings_summary["runs"] + 1
             target_achieved = self.total_runs >= target
-        
-        return overs_complete or all_out or target_achieved
+
+        innings_complete = self.max_overs is not None and (overs_complete or all_out or target_achieved)
+        match_complete = bool(self.first_innings_summary) and self.current_innings == 2 and innings_complete
+
+        winner = None
+        if match_complete:
+            if target_achieved:
+                # Second innings team achieved target
+                winner = batting.team_name if batting else None
+            else:
+                # First innings team won (second innings failed to achieve target)
+                winner = self.bowling_team.team_name if self.bowling_team else None
+
+        status = MatchStatus(overs_complete, all_out, target, target_achieved, innings_complete, match_complete, winner)
+        self._status_cache = (key, status)
+        return status
+
+    def is_innings_complete(self) -> bool:
+        """Check if innings is complete (all overs bowled, all wickets fallen, or target achieved)"""
+        return self.get_status().innings_complete
 
     def is_match_complete(self) -> bool:
         """Check if the entire match is complete"""
-        if not self.first_innings_summary or self.current_innings != 2:
-            return False
-        
-        # Check if second innings is complete
-        return self.is_innings_complete()
+        return self.get_status().match_complete
 
     def get_match_winner(self) -> Optional[str]:
         """Get the winning team"""
-        if not self.is_match_complete():
-            return None
-        
-        if self.current_innings == 2 and self.first_innings_summary:
-            target = self.first_innings_summary["runs"] + 1
-            if self.total_runs >= target:
-                # Second innings team achieved target
-                return self.batting_team.team_name if self.batting_team else None
-            else:
-                # First innings team won (second innings failed to achieve target)
-                return self.bowling_team.team_name if self.bowling_team else None
-        
+        return self.get_status().winner
+
+    def get_player_by_id(self, player_id: str) -> Optional[Player]:
+        """Get a player from either team by ID"""
+        for team in (self.team_a, self.team_b):
+            if team:
+                player = team.get_player_by_id(player_id)
+                if player:
+                    return player
+        return None
+
+    def find_player_by_name(self, name: str) -> Optional[Player]:
+        """Get a player from either team by name"""
+        for team in (self.team_a, self.team_b):
+            if team:
+                player = team.get_player_by_name(name)
+                if player:
+                    return player
         return None
 
+    def _player_name(self, player_id: Optional[str]) -> Optional[str]:
+        player = self.get_player_by_id(player_id) if player_id else None
+        return player.name if player else None
+
+    def _index_dismissal(self, innings: int, event: BallEvent):
+        if event.is_wicket and event.batsman_id:
+            self.dismissals.setdefault(innings, {})[event.batsman_id] = {
+                'type': event.wicket_type.value.replace('_', ' ').title() if event.wicket_type else None,
+                'bowler_id': event.bowler_id,
+                'catcher_id': event.catcher_id,
+                'runout_by': list(event.runout_by or [])
+            }
+
+    def _resolve_dismissal(self, dismissal: Dict[str, Any]) -> Dict[str, Any]:
+        """Dismissal details with player names, looked up now so renamed players show their new name"""
+        return {
+            'type': dismissal['type'],
+            'bowler': self._player_name(dismissal['bowler_id']),
+            'catcher': self._player_name(dismissal['catcher_id']),
+            'runout_by': [name for name in map(self._player_name, dismissal['runout_by']) if name]
+        }
+
     def get_player_dismissal(self, player_id: str) -> Optional[Dict[str, Any]]:
         """Get dismissal details for a player"""
-        for event in self.events:
-            if event.batsman_id == player_id and event.is_wicket:
-                dismissal = {
-                    'type': event.wicket_type.value.replace('_', ' ').title(),
-                    'bowler': None,
-                    'catcher': None,
-                    'runout_by': []
-                }
-                
-                # Find bowler name
-                if event.bowler_id:
-                    for team in [self.team_a, self.team_b]:
-                        if team:
-                            for player in team.players:
-                                if player.id == event.bowler_id:
-                                    dismissal['bowler'] = player.name
-                                    break
-                
-                # Find catcher name
-                if event.catcher_id:
-                    for team in [self.team_a, self.team_b]:
-                        if team:
-                            for player in team.players:
-                                if player.id == event.catcher_id:
-                                    dismissal['catcher'] = player.name
-                                    break
-                
-                # Find runout players
-                if event.runout_by:
-                    for team in [self.team_a, self.team_b]:
-                        if team:
-                            for player in team.players:
-                                if player.id in event.runout_by:
-                                    dismissal['runout_by'].append(player.name)
-                
-                return dismissal
+        current = self.dismissals.get(self.current_innings, {})
+        if player_id in current:
+            return self._resolve_dismissal(current[player_id])
+        for innings_dismissals in self.dismissals.values():
+            if player_id in innings_dismissals:
+                return self._resolve_dismissal(innings_dismissals[player_id])
         return None
 
+    def get_all_dismissals(self) -> Dict[str, Dict[str, Any]]:
+        """Get dismissal details for every dismissed batsman, keyed by player ID"""
+        all_dismissals = {}
+        for innings in sorted(self.dismissals):
+            for player_id, dismissal in self.dismissals[innings].items():
+                all_dismissals[player_id] = self._resolve_dismissal(dismissal)
+        return all_dismissals
+
     def switch_innings(self):
         """Switch batting and bowling teams for next innings"""
+        self._redo_stack.clear()
+        self._switch_innings()
+
+    def _switch_innings(self):
+        self._undo_stack.append(SwitchDelta(
+            self.striker.id if self.striker else None,
+            self.non_striker.id if self.non_striker else None,
+            self.current_bowler.id if self.current_bowler else None,
+            self.current_over, self.current_ball, self.total_runs, self.wickets,
+            self.first_innings_summary, self.tally,
+            tuple((len(team.batting_order), len(team.bowling_order)) for team in (self.team_a, self.team_b))
+        ))
         # Store first innings summary
         if self.current_innings == 1:
             self.first_innings_summary = self.get_innings_summary()
@@ -355,13 +1078,228 @@ class MatchState:
         self.striker = None
         self.non_striker = None
         self.current_bowler = None
-        self.events.clear()
+        self.innings_events[self.current_innings - 1] = self.events
+        self.events = BallEventLog()
+        self.tally = InningsTally()
+        self._mark_structural()
+
+    def _unswitch_innings(self, delta: SwitchDelta):
+        """Reverse _switch_innings(): the finished innings becomes the current one again"""
+        innings = self.current_innings - 1
+        self.batting_team, self.bowling_team = self.bowling_team, self.batting_team
+        self.current_innings = innings
+        self.events = self.innings_events.pop(innings)
+        self._innings_overs.pop(innings, None)
+        self.tally = delta.tally
+        self.first_innings_summary = delta.first_innings_summary
+        self.current_over, self.current_ball = delta.current_over, delta.current_ball
+        self.total_runs, self.wickets = delta.total_runs, delta.wickets
+        self.striker = self.get_player_by_id(delta.striker_id) if delta.striker_id else None
+        self.non_striker = self.get_player_by_id(delta.non_striker_id) if delta.non_striker_id else None
+        self.current_bowler = self.get_player_by_id(delta.bowler_id) if delta.bowler_id else None
+        # Drop the openers and bowler picked for the innings being undone
+        for team, (batted, bowled) in zip((self.team_a, self.team_b), delta.orders):
+            del team.batting_order[batted:]
+            del team.bowling_order[bowled:]
+        self._mark_structural()
+
+    def find_player(self, team: Optional[Team], player_id: str) -> Player:
+        """The player with player_id in team (ValueError if there is none)"""
+        player = team.get_player_by_id(player_id) if team else None
+        if player is None:
+            raise ValueError("Player not found in team")
+        return player
+
+    def set_openers(self, striker_id: str, non_striker_id: str, bowler_id: str):
+        """Set the opening batsmen and bowler for the current innings"""
+        if striker_id == non_striker_id:
+            raise ValueError("Striker and non-striker must be different players")
+        # Check every player before changing anything
+        striker = self.find_player(self.batting_team, striker_id)
+        non_striker = self.find_player(self.batting_team, non_striker_id)
+        self.find_player(self.bowling_team, bowler_id)
+        self.striker, self.non_striker = striker, non_striker
+        for player in (self.striker, self.non_striker):
+            if player.id not in self.batting_team.batting_order:
+                self.batting_team.batting_order.append(player.id)
+        self.set_bowler(bowler_id)
+
+    def set_bowler(self, bowler_id: str):
+        """Set the bowler for the current over"""
+        self.current_bowler = self.find_player(self.bowling_team, bowler_id)
+        if bowler_id not in self.bowling_team.bowling_order:
+            self.bowling_team.bowling_order.append(bowler_id)
+        self.mark_changed()
+
+    def score_ball(self, runs: int, extra_type: Optional[str] = None, wicket_type: Optional[WicketType] = None,
+                   catcher_id: Optional[str] = None, runout_by: Optional[List[str]] = None,
+                   comment: str = "") -> BallEvent:
+        """Score one delivery: player stats, totals, strike rotation and over progress"""
+        if not self.striker or not self.non_striker or not self.current_bowler:
+            raise ValueError("Set the batsmen and bowler before scoring")
+        if self.is_innings_complete():
+            raise ValueError("Innings is complete")
+        if runs < 0:
+            raise ValueError("Runs cannot be negative")
+        if extra_type is not None and extra_type not in ("wide", "no-ball", "bye", "leg-bye", "dead-ball"):
+            raise ValueError(f"Unknown extra type: {extra_type}")
+
+        striker, bowler = self.striker, self.current_bowler
+        before = self._ball_side(striker, bowler)
+
+        legal = extra_type not in NON_LEGAL_EXTRAS
+        event = BallEvent(
+            ball_number=self.current_ball + (1 if legal else 0),
+            over_number=self.current_over,
+            runs=runs,
+            is_wicket=wicket_type is not None,
+            wicket_type=wicket_type,
+            batsman_id=striker.id,
+            bowler_id=bowler.id,
+            catcher_id=catcher_id,
+            runout_by=runout_by,
+            extra_type=extra_type,
+            description=f"{runs} run{'s' if runs != 1 else ''}" + (f" ({extra_type})" if extra_type else ""),
+            comment=comment
+        )
+        total = event_total_runs(event)
+        self.total_runs += total
+
+        # Batting: runs off the bat (including off a no-ball); every delivery but a wide/dead ball is faced
+        batting = striker.batting_stats
+        off_bat = runs if extra_type in (None, "no-ball") else 0
+        batting.runs += off_bat
+        batting.fours += off_bat == 4
+        batting.sixes += off_bat == 6
+        if extra_type not in ("wide", "dead-ball"):
+            batting.balls += 1
+            batting.dots += off_bat == 0
+
+        # Bowling: byes and leg-byes are not charged to the bowler, run outs are not credited
+        bowling = bowler.bowling_stats
+        charged = total if extra_type not in ("bye", "leg-bye") else 0
+        bowling.runs += charged
+        bowling.wides += extra_type == "wide"
+        bowling.no_balls += extra_type == "no-ball"
+        if legal:
+            bowling.balls += 1
+            bowling.dots += charged == 0
+        if wicket_type is not None and wicket_type not in (WicketType.RUN_OUT, WicketType.RETIRED):
+            bowling.wickets += 1
+
+        self.add_event(event)
+
+        incoming_id = None
+        if wicket_type is not None:
+            self.wickets += 1
+            incoming = self.batting_team.get_players_not_batted()
+            self.striker = incoming[0] if incoming else None
+            if self.striker:
+                incoming_id = self.striker.id
+                self.batting_team.batting_order.append(incoming_id)
+
+        if runs % 2 == 1 and self.striker:
+            self.striker, self.non_striker = self.non_striker, self.striker
+
+        if legal:
+            self.current_ball += 1
+            if self.current_ball == 6:
+                self.current_over += 1
+                self.current_ball = 0
+                self.striker, self.non_striker = self.non_striker, self.striker
+
+        self._undo_stack.append(BallDelta(event, before, incoming_id))
+        self._redo_stack.clear()
+        return event
+
+    def _ball_side(self, batsman: Player, bowler: Player) -> BallSide:
+        return BallSide(
+            self.striker.id if self.striker else None,
+            self.non_striker.id if self.non_striker else None,
+            self.current_bowler.id if self.current_bowler else None,
+            self.current_over, self.current_ball, self.total_runs, self.wickets,
+            len(self.batting_team.batting_order), len(self.bowling_team.bowling_order),
+            replace(batsman.batting_stats), replace(bowler.bowling_stats)
+        )
+
+    def _restore_ball_side(self, side: BallSide, event: BallEvent):
+        self.striker = self.get_player_by_id(side.striker_id) if side.striker_id else None
+        self.non_striker = self.get_player_by_id(side.non_striker_id) if side.non_striker_id else None
+        self.current_bowler = self.get_player_by_id(side.bowler_id) if side.bowler_id else None
+        self.current_over, self.current_ball = side.current_over, side.current_ball
+        self.total_runs, self.wickets = side.total_runs, side.wickets
+        # Copies, so the delta stays intact for the next undo/redo of the same ball
+        self.get_player_by_id(event.batsman_id).batting_stats = replace(side.batting)
+        self.get_player_by_id(event.bowler_id).bowling_stats = replace(side.bowling)
+
+    def undo(self) -> Union[BallEvent, str, None]:
+        """Undo the last scoring command: returns the removed BallEvent, 'switch_innings', or None if there is nothing to undo
+
+        Each command kept a small inverse delta, so this costs the same
+        however long the match is; at most the last UNDO_DEPTH commands can
+        be undone. The deltas are saved with the match (see to_snapshot and
+        make_log_record), so they survive a reload from the store.
+        """
+        if not self._undo_stack:
+            return None
+        delta = self._undo_stack[-1]
+        if isinstance(delta, SwitchDelta):
+            if self.events:
+                # Balls scored in this innings without an undo record (e.g. replayed from the store)
+                return None
+            self._undo_stack.pop()
+            self._unswitch_innings(delta)
+            self._redo_stack.append(delta)
+            return 'switch_innings'
+        if not self.events or self.events[-1] != delta.event:
+            return None
+        self._undo_stack.pop()
+        self._redo_stack.append(self._undone(delta))
+        self._restore_ball_side(delta.before, delta.event)
+        del self.batting_team.batting_order[delta.before.batted:]
+        del self.bowling_team.bowling_order[delta.before.bowled:]
+        self.undo_last_event()
+        return delta.event
+
+    def _undone(self, delta: BallDelta) -> BallDelta:
+        """delta with the scoreboard as it is now (any bowler change since the ball included), for redo"""
+        return replace(delta, after=self._ball_side(self.get_player_by_id(delta.event.batsman_id),
+                                                    self.get_player_by_id(delta.event.bowler_id)))
+
+    def redo(self) -> Union[BallEvent, str, None]:
+        """Redo the last undone command (until something else changes the match); returns as undo() does"""
+        if not self._redo_stack:
+            return None
+        delta = self._redo_stack.pop()
+        if isinstance(delta, SwitchDelta):
+            self._switch_innings()
+            return 'switch_innings'
+        # Openers and bowler chosen before the ball but not by an undoable command (e.g. after a redone switch)
+        for player_id in (delta.before.striker_id, delta.before.non_striker_id):
+            if player_id not in self.batting_team.batting_order:
+                self.batting_team.batting_order.append(player_id)
+        if delta.before.bowler_id not in self.bowling_team.bowling_order:
+            self.bowling_team.bowling_order.append(delta.before.bowler_id)
+        self.add_event(delta.event)
+        if delta.incoming_id is not None:
+            self.batting_team.batting_order.append(delta.incoming_id)
+        self._restore_ball_side(delta.after, delta.event)
+        if delta.after.bowler_id and delta.after.bowler_id not in self.bowling_team.bowling_order:
+            # A bowler brought on after the ball
+            self.bowling_team.bowling_order.append(delta.after.bowler_id)
+        self._undo_stack.append(replace(delta, after=None))
+        return delta.event
 
     def get_match_result(self) -> Dict[str, Any]:
-        """Get match result with winner and player of the match"""
+        """Get match result with winner and player of the match (cached per state, like get_status)"""
         if not self.first_innings_summary or self.current_innings != 2:
             return None
-        
+        key = self._status_key()
+        if self._result_cache is None or self._result_cache[0] != key:
+            self._result_cache = (key, self._build_match_result())
+        return dict(self._result_cache[1])
+
+    def _build_match_result(self) -> Dict[str, Any]:
         first_runs = self.first_innings_summary["runs"]
         second_runs = self.total_runs
         
@@ -409,8 +1347,187 @@ class MatchState:
         }
 
     def get_ball_by_ball(self) -> List[Dict[str, Any]]:
-        """Get list of all balls with details"""
-        return [event.to_dict() for event in self.events]
+        """Get list of all balls with details (prefer iter_balls/get_balls_page for long innings)"""
+        return [event.to_dict() for event in self.iter_balls()]
+
+    def team_key(self, team: Optional[Team]) -> Optional[str]:
+        """'a' or 'b' for team_a or team_b, as snapshots and ball logs refer to them"""
+        if team is None:
+            return None
+        return 'a' if team is self.team_a else 'b'
+
+    def _team_for_key(self, key: Optional[str]) -> Optional[Team]:
+        return {'a': self.team_a, 'b': self.team_b}.get(key)
+
+    def _scoreboard_record(self) -> Dict[str, Any]:
+        """Counters and current players, i.e. what a single ball can change besides stats"""
+        return {
+            'current_innings': self.current_innings,
+            'current_over': self.current_over,
+            'current_ball': self.current_ball,
+            'total_runs': self.total_runs,
+            'wickets': self.wickets,
+            'overs_completed': self.overs_completed,
+            'batting_team': self.team_key(self.batting_team),
+            'striker_id': self.striker.id if self.striker else None,
+            'non_striker_id': self.non_striker.id if self.non_striker else None,
+            'bowler_id': self.current_bowler.id if self.current_bowler else None,
+            'orders': {
+                key: [list(team.batting_order), list(team.bowling_order)]
+                for key, team in (('a', self.team_a), ('b', self.team_b)) if team
+            }
+        }
+
+    def _apply_scoreboard_record(self, record: Dict[str, Any]):
+        for name in ('current_innings', 'current_over', 'current_ball', 'total_runs', 'wickets', 'overs_completed'):
+            setattr(self, name, record[name])
+        self.batting_team = self._team_for_key(record['batting_team'])
+        if self.batting_team:
+            self.bowling_team = self.team_b if self.batting_team is self.team_a else self.team_a
+        self.striker = self.get_player_by_id(record['striker_id']) if record['striker_id'] else None
+        self.non_striker = self.get_player_by_id(record['non_striker_id']) if record['non_striker_id'] else None
+        self.current_bowler = self.get_player_by_id(record['bowler_id']) if record['bowler_id'] else None
+        for key, (batting_order, bowling_order) in record['orders'].items():
+            team = self._team_for_key(key)
+            team.batting_order = list(batting_order)
+            team.bowling_order = list(bowling_order)
+
+    def to_snapshot(self, undo_history: bool = False, ball_logs: bool = True) -> Dict[str, Any]:
+        """Lossless, JSON-serialisable snapshot of the whole match (with the undo/redo deltas if undo_history)
+
+        With ball_logs=False (for clients, which page the balls through
+        /api/balls) the ball logs are replaced by each innings' ball count;
+        such a snapshot cannot be restored with from_snapshot.
+        """
+        snapshot = {
+            'format': SNAPSHOT_FORMAT,
+            'version': self.version,
+            'team_a': self.team_a.to_record() if self.team_a else None,
+            'team_b': self.team_b.to_record() if self.team_b else None,
+            'max_overs': self.max_overs,
+            'batting_first_team_name': self.batting_first_team_name,
+            'match_name': self.match_name,
+            'first_innings_summary': self.first_innings_summary,
+            'scoreboard': self._scoreboard_record()
+        }
+        if ball_logs:
+            snapshot['events'] = [event.to_record() for event in self.events]
+            snapshot['innings_events'] = {
+                str(innings): [event.to_record() for event in events]
+                for innings, events in self.innings_events.items()
+            }
+        else:
+            snapshot['balls'] = {str(innings): len(events) for innings, events in self.innings_events.items()}
+            snapshot['balls'][str(self.current_innings)] = len(self.events)
+        if undo_history:
+            snapshot['undo_history'] = {
+                'undo': [delta.to_record() for delta in self._undo_stack],
+                'redo': [delta.to_record() for delta in self._redo_stack]
+            }
+        return snapshot
+
+    def _restore_undo_history(self, record: Dict[str, Any]):
+        innings = self.current_innings
+        undo = []
+        for item in reversed(record['undo']):
+            if 'event' in item:
+                undo.append(BallDelta.from_record(item))
+            else:
+                # Each undoable switch ended the innings before the one after it
+                innings -= 1
+                tally = InningsTally.from_events(self.innings_events.get(innings, ()))
+                undo.append(SwitchDelta.from_record(item, tally))
+        self._undo_stack.extend(reversed(undo))
+        for item in record['redo']:
+            # redo() starts a new switch from the current state, so a redoable switch's tally is not used
+            self._redo_stack.append(BallDelta.from_record(item) if 'event' in item
+                                    else SwitchDelta.from_record(item, self.tally))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> 'MatchState':
+        """Rebuild a match from to_snapshot() output"""
+        if snapshot.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {snapshot.get('format')}")
+        match = cls(
+            team_a=Team.from_record(snapshot['team_a']) if snapshot['team_a'] else None,
+            team_b=Team.from_record(snapshot['team_b']) if snapshot['team_b'] else None,
+            max_overs=snapshot['max_overs'],
+            batting_first_team_name=snapshot['batting_first_team_name'],
+            match_name=snapshot['match_name'],
+            first_innings_summary=snapshot['first_innings_summary']
+        )
+        match._apply_scoreboard_record(snapshot['scoreboard'])
+        match.events = BallEventLog(BallEvent.from_record(event) for event in snapshot['events'])
+        match.tally = InningsTally.from_events(match.events)
+        match.innings_events = {
+            int(innings): BallEventLog(BallEvent.from_record(event) for event in events)
+            for innings, events in snapshot.get('innings_events', {}).items()
+        }
+        # Rebuilt from the ball logs (older snapshots also carry a copy with player names)
+        for innings, log in [*sorted(match.innings_events.items()), (match.current_innings, match.events)]:
+            for event in log:
+                match._index_dismissal(innings, event)
+        match.version = match._changes_base = snapshot['version']
+        if 'undo_history' in snapshot:
+            match._restore_undo_history(snapshot['undo_history'])
+        return match
+
+    def make_log_record(self, op: str, event: Optional[BallEvent] = None) -> Dict[str, Any]:
+        """Build a small log record for a ball ('ball'), undo ('undo') or redo ('redo') just applied to this match"""
+        player_ids = {self.striker.id if self.striker else None,
+                      self.non_striker.id if self.non_striker else None,
+                      self.current_bowler.id if self.current_bowler else None}
+        if event:
+            player_ids.update((event.batsman_id, event.bowler_id))
+        players = {}
+        for player_id in player_ids:
+            player = self.get_player_by_id(player_id) if player_id else None
+            if player:
+                players[player_id] = [asdict(player.batting_stats), asdict(player.bowling_stats)]
+        record = {'op': op, 'version': self.version, 'scoreboard': self._scoreboard_record(), 'players': players}
+        if op in ('ball', 'redo'):
+            record['event'] = event.to_record()
+        delta = self._top_ball_delta(self._undo_stack, event) if op == 'ball' else None
+        if delta is not None:
+            # The event itself is already in the record
+            record['undo'] = [delta.before.to_record(), delta.incoming_id]
+        return record
+
+    def apply_log_record(self, record: Dict[str, Any]):
+        """Replay a record produced by make_log_record(), undo/redo deltas included"""
+        if record['op'] in ('ball', 'redo'):
+            event = BallEvent.from_record(record['event'])
+            self.add_event(event)
+            if record['op'] == 'ball':
+                self._redo_stack.clear()
+                if 'undo' in record:
+                    before, incoming_id = record['undo']
+                    self._undo_stack.append(BallDelta(event, BallSide.from_record(before), incoming_id))
+            elif self._top_ball_delta(self._redo_stack, event) is not None:
+                self._undo_stack.append(replace(self._redo_stack.pop(), after=None))
+        elif record['op'] == 'undo':
+            # Same stack moves as undo(), made before the scoreboard is replaced below
+            if self._top_ball_delta(self._undo_stack, self.events[-1] if self.events else None) is not None:
+                self._redo_stack.append(self._undone(self._undo_stack.pop()))
+            self.undo_last_event()
+        else:
+            raise ValueError(f"Unknown log record: {record['op']}")
+        for player_id, (batting, bowling) in record['players'].items():
+            player = self.get_player_by_id(player_id)
+            player.batting_stats = BattingStats.from_dict(batting)
+            player.bowling_stats = BowlingStats.from_dict(bowling)
+        self._apply_scoreboard_record(record['scoreboard'])
+        if record['version'] != self.version:
+            # Changes that were not logged (e.g. a bowler change) happened in between
+            self.version = self._changes_base = record['version']
+            self._changes.clear()
+
+    @staticmethod
+    def _top_ball_delta(stack: deque, event: Optional[BallEvent]) -> Optional[BallDelta]:
+        """The newest delta of stack if it is for event"""
+        if event is not None and stack and isinstance(stack[-1], BallDelta) and stack[-1].event == event:
+            return stack[-1]
+        return None
 
 
 # Import UUID for unique player IDs
@@ -0,0 +1,68 @@
+"""
+Tournament booklet export for the Cricket Scoring Application
+Builds one PDF (contents page, then each match's scoreboard and summary)
+for a list of matches in the match store. Matches are recovered one at a
+time as the story is assembled, and everything runs in this process:
+ReportLab lays out a single document, and separately rendered sections
+could not be merged without a PDF library the project does not use.
+
+Usage: python pdf_booklet.py OUTPUT.pdf [MATCH_ID ...] [--db PATH]
+(all stored matches are exported when no IDs are given)
+"""
+
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from models import MatchState
+from match_store import MatchStore, SQLiteMatchStore
+
+
+def _match_data(match: MatchState) -> Dict[str, Any]:
+    return {'match': match, 'match_name': match.match_name or 'Cricket Match'}
+
+
+def iter_match_data(store: MatchStore, match_ids: List[str]) -> Iterator[Dict[str, Any]]:
+    """Yield PDF match_data for match_ids in order, skipping IDs the store does not have"""
+    for match_id in match_ids:
+        match = store.load(match_id)
+        if match is not None:
+            yield _match_data(match)
+
+
+def export_booklet(store: MatchStore, output_path: str, match_ids: Optional[List[str]] = None,
+                   title: str = "Tournament Booklet") -> Dict[str, Any]:
+    """Write a booklet PDF for match_ids (default: every stored match) and report throughput"""
+    # Imported here so ReportLab is only loaded when a booklet is built
+    from pdf_generator import generate_booklet_pdf
+    if match_ids is None:
+        match_ids = store.list_match_ids()
+    started = time.perf_counter()
+    count = generate_booklet_pdf(iter_match_data(store, match_ids), output_path, title)
+    seconds = time.perf_counter() - started
+    return {
+        'output': output_path,
+        'matches': count,
+        'seconds': round(seconds, 3),
+        'matches_per_second': round(count / seconds, 2) if seconds else None,
+        'bytes': os.path.getsize(output_path)
+    }
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Export stored matches as one tournament booklet PDF')
+    parser.add_argument('output')
+    parser.add_argument('match_ids', nargs='*')
+    parser.add_argument('--db', help='SQLite store path (default: CRICSMART_DB_PATH or the temp dir)')
+    parser.add_argument('--title', default='Tournament Booklet')
+    args = parser.parse_args()
+
+    store = SQLiteMatchStore(args.db)
+    result = export_booklet(store, args.output, args.match_ids or None, args.title)
+    print(f"{result['matches']} matches in {result['seconds']}s "
+          f"({result['matches_per_second']} matches/s), {result['bytes'] / 1024:.0f} KB -> {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
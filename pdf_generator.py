@@ -5,56 +5,85 @@ Generates professional PDF reports with scoreboard and summary tabs
 
 import os
 import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus.tableofcontents import TableOfContents
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
+import tracing
+
+
+@lru_cache(maxsize=None)
+def _shared_styles():
+    """Build the stylesheet and custom styles once per process (they are never mutated)"""
+    styles = getSampleStyleSheet()
+    
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=20,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    )
+    
+    # Header style
+    header_style = ParagraphStyle(
+        'CustomHeader',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12,
+        textColor=colors.darkblue
+    )
+    
+    # Normal text style
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6
+    )
+    
+    # Small text style
+    small_style = ParagraphStyle(
+        'CustomSmall',
+        parent=styles['Normal'],
+        fontSize=8,
+        spaceAfter=3
+    )
+    
+    return styles, title_style, header_style, normal_style, small_style
+
+
+class BookletDocTemplate(SimpleDocTemplate):
+    """Document template that adds each match title to the contents page and the PDF outline"""
+    
+    def afterFlowable(self, flowable):
+        entry = getattr(flowable, 'toc_entry', None)
+        if entry:
+            key = f"match-{id(flowable)}"
+            self.canv.bookmarkPage(key)
+            self.canv.addOutlineEntry(entry, key, level=0)
+            self.notify('TOCEntry', (0, entry, self.page, key))
+
 
 class CricketScoreboardPDF:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
         self.setup_custom_styles()
     
     def setup_custom_styles(self):
-        """Setup custom styles for PDF formatting"""
-        # Title style
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        )
-        
-        # Header style
-        self.header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            spaceAfter=12,
-            textColor=colors.darkblue
-        )
-        
-        # Normal text style
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6
-        )
-        
-        # Small text style
-        self.small_style = ParagraphStyle(
-            'CustomSmall',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            spaceAfter=3
-        )
+        """Setup custom styles for PDF formatting (shared across instances)"""
+        (self.styles, self.title_style, self.header_style,
+         self.normal_style, self.small_style) = _shared_styles()
     
     def generate_scoreboard_pdf(self, match_data, output_path=None):
         """Generate complete scoreboard PDF with scoreboard and summary tabs"""
@@ -65,10 +94,30 @@ class CricketScoreboardPDF:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = os.path.join(temp_dir, f"cricket_scoreboard_{timestamp}.pdf")
         
+        self._build(match_data, output_path)
+        
+        return output_path
+    
+    def generate_scoreboard_pdf_bytes(self, match_data):
+        """Generate the scoreboard PDF in memory and return its bytes"""
+        buffer = BytesIO()
+        self._build(match_data, buffer)
+        return buffer.getvalue()
+    
+    def _build(self, match_data, output):
+        """Build the document into a file path or file-like object"""
         # Create PDF document
-        doc = SimpleDocTemplate(output_path, pagesize=A4)
+        doc = SimpleDocTemplate(output, pagesize=A4)
         story = []
+        with tracing.span('pdf.story'):
+            self._add_match_sections(story, match_data)
         
+        # Build PDF
+        with tracing.span('pdf.layout'):
+            doc.build(story)
+    
+    def _add_match_sections(self, story, match_data):
+        """Add the scoreboard and summary sections of one match"""
         # Add scoreboard section
         self._add_scoreboard_section(story, match_data)
         
@@ -77,11 +126,42 @@ class CricketScoreboardPDF:
         
         # Add summary section
         self._add_summary_section(story, match_data)
-        
-        # Build PDF
-        doc.build(story)
-        
-        return output_path
+    
+    def generate_booklet_pdf(self, matches, output_path, title="Tournament Booklet"):
+        """Generate one PDF with a contents page followed by every match's sections
+        
+        matches is an iterable of match_data dicts, best a generator such as
+        pdf_booklet.iter_match_data: the story is built one match at a time,
+        so only one match is held while its flowables are made. Peak memory
+        still grows with the number of matches, because multiBuild needs the
+        whole story at once (it lays it out more than once to number the
+        contents page). The document is written to output_path. Returns the number of
+        matches included.
+        """
+        doc = BookletDocTemplate(output_path, pagesize=A4, title=title)
+        toc = TableOfContents()
+        toc.levelStyles = [self.normal_style]
+        story = [Paragraph(title.upper(), self.title_style), Paragraph("CONTENTS", self.header_style), toc]
+        
+        count = 0
+        with tracing.span('pdf.booklet.story'):
+            for flowables in self._booklet_sections(matches):
+                story.extend(flowables)
+                count += 1
+        
+        # Contents page numbers need a second layout pass
+        with tracing.span('pdf.booklet.layout'):
+            doc.multiBuild(story)
+        return count
+    
+    def _booklet_sections(self, matches):
+        """Yield each match's flowables in turn, starting on a new page"""
+        for match_data in matches:
+            flowables = [PageBreak()]
+            self._add_match_sections(flowables, match_data)
+            # The match title paragraph becomes the contents entry
+            flowables[1].toc_entry = match_data.get('match_name', 'Cricket Match')
+            yield flowables
     
     def _add_scoreboard_section(self, story, match_data):
         """Add scoreboard section to PDF"""
@@ -98,17 +178,6 @@ class CricketScoreboardPDF:
             story.append(Paragraph("No match data available", self.normal_style))
             return
         
-        # Debug match completion status
-        print(f"DEBUG PDF: Match completion check:")
-        print(f"  - has first_innings_summary: {hasattr(match_info, 'first_innings_summary')}")
-        print(f"  - first_innings_summary value: {getattr(match_info, 'first_innings_summary', None)}")
-        print(f"  - current_innings: {getattr(match_info, 'current_innings', None)}")
-        print(f"  - is_innings_complete(): {match_info.is_innings_complete() if hasattr(match_info, 'is_innings_complete') else 'N/A'}")
-        print(f"  - is_match_complete(): {match_info.is_match_complete() if hasattr(match_info, 'is_match_complete') else 'N/A'}")
-        print(f"  - get_match_winner(): {match_info.get_match_winner() if hasattr(match_info, 'get_match_winner') else 'N/A'}")
-        print(f"  - match_data keys: {list(match_data.keys())}")
-        print(f"  - match_winner from match_data: {match_data.get('match_winner', 'N/A')}")
-        
         team_a = getattr(match_info, 'team_a', None)
         team_b = getattr(match_info, 'team_b', None)
         
@@ -145,12 +214,13 @@ class CricketScoreboardPDF:
         story.append(score_paragraph)
         story.append(Spacer(1, 15))
         
-        # Batting Scorecard
+        # Batting Scorecard (dismissals resolved once for both teams)
+        dismissals = match_info.get_all_dismissals() if hasattr(match_info, 'get_all_dismissals') else {}
         if team_a:
-            self._add_batting_scorecard(story, team_a, "Team A Batting")
+            self._add_batting_scorecard(story, team_a, "Team A Batting", dismissals)
         
         if team_b:
-            self._add_batting_scorecard(story, team_b, "Team B Batting")
+            self._add_batting_scorecard(story, team_b, "Team B Batting", dismissals)
         
         # Bowling Figures
         if team_a:
@@ -195,7 +265,6 @@ class CricketScoreboardPDF:
             
             # Add Man of the Match
             player_of_match = match_data.get('player_of_match')
-            print(f"DEBUG PDF: Player of the Match data: {player_of_match}")
             
             if player_of_match:
                 motm_name = player_of_match.get('name', 'N/A')
@@ -204,7 +273,6 @@ class CricketScoreboardPDF:
             else:
                 # Fallback to match_result if available
                 match_result = match_data.get('match_result', {})
-                print(f"DEBUG PDF: Match result data: {match_result}")
                 
                 # Check multiple possible Man of the Match field names
                 man_of_match = (match_result.get('man_of_match') or 
@@ -214,8 +282,6 @@ class CricketScoreboardPDF:
                                match_result.get('MOTM') or 
                                match_result.get('playerOfMatch'))
                 
-                print(f"DEBUG PDF: Man of the Match found: {man_of_match}")
-                
                 # If it's an object, extract the name
                 if man_of_match and isinstance(man_of_match, dict):
                     man_of_match = (man_of_match.get('name') or 
@@ -269,7 +335,6 @@ class CricketScoreboardPDF:
         
         # Key Events
         events = getattr(match_info, 'events', [])
-        print(f"DEBUG PDF: Total events found: {len(events)}")
         
         if events:
             story.append(Paragraph("KEY EVENTS", self.header_style))
@@ -312,7 +377,7 @@ class CricketScoreboardPDF:
         else:
             story.append(Paragraph("No events recorded", self.normal_style))
     
-    def _add_batting_scorecard(self, story, team, title):
+    def _add_batting_scorecard(self, story, team, title, dismissals=None):
         """Add batting scorecard for a team"""
         story.append(Paragraph(f"{title}", self.header_style))
         story.append(Spacer(1, 10))
@@ -324,13 +389,16 @@ class CricketScoreboardPDF:
             return
         
         # Prepare batting data
-        batting_data = [["Batsman", "Runs", "Balls", "4s", "6s", "S/R"]]
+        dismissals = dismissals or {}
+        batting_data = [["Batsman", "Dismissal", "Runs", "Balls", "4s", "6s", "S/R"]]
         
         for player in players:
             batting_stats = getattr(player, 'batting_stats', None)
             if batting_stats:
+                batted = getattr(batting_stats, 'balls', 0) > 0
                 batting_data.append([
                     getattr(player, 'name', 'Unknown'),
+                    self._format_dismissal(dismissals.get(getattr(player, 'id', None)), batted),
                     str(getattr(batting_stats, 'runs', 0)),
                     str(getattr(batting_stats, 'balls', 0)),
                     str(getattr(batting_stats, 'fours', 0)),
@@ -338,7 +406,7 @@ class CricketScoreboardPDF:
                     f"{getattr(batting_stats, 'strike_rate', 0):.2f}" if getattr(batting_stats, 'strike_rate', 0) else "0.00"
                 ])
         
-        batting_table = Table(batting_data, colWidths=[2*inch, 0.8*inch, 0.8*inch, 0.5*inch, 0.5*inch, 0.8*inch])
+        batting_table = Table(batting_data, colWidths=[1.5*inch, 1.9*inch, 0.6*inch, 0.6*inch, 0.4*inch, 0.4*inch, 0.6*inch])
         batting_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -353,6 +421,34 @@ class CricketScoreboardPDF:
         story.append(batting_table)
         story.append(Spacer(1, 15))
     
+    def _format_dismissal(self, dismissal, batted=False):
+        """Format dismissal details in scorecard notation (e.g. "c Smith b Jones")"""
+        if not dismissal:
+            return "not out" if batted else ""
+        
+        kind = (dismissal.get('type') or '').lower()
+        bowler = dismissal.get('bowler') or ''
+        catcher = dismissal.get('catcher') or ''
+        
+        if kind == 'caught':
+            text = f"c & b {bowler}" if bowler and catcher == bowler else f"c {catcher} b {bowler}"
+        elif kind == 'bowled':
+            text = f"b {bowler}"
+        elif kind == 'lbw':
+            text = f"lbw b {bowler}"
+        elif kind == 'stumped':
+            text = f"st {catcher} b {bowler}"
+        elif kind == 'hit wicket':
+            text = f"hit wicket b {bowler}"
+        elif kind == 'run out':
+            fielders = "/".join(dismissal.get('runout_by') or [])
+            text = f"run out ({fielders})" if fielders else "run out"
+        else:
+            text = kind or "out"
+        
+        text = " ".join(text.split())
+        return text[:28] + "..." if len(text) > 28 else text
+    
     def _add_bowling_figures(self, story, team, title, match_data):
         """Add bowling figures for a team"""
         story.append(Paragraph(f"{title}", self.header_style))
@@ -364,22 +460,7 @@ class CricketScoreboardPDF:
             story.append(Spacer(1, 15))
             return
         
-        # Debug bowling data and check alternative sources
-        print(f"DEBUG PDF: Checking bowling figures for {title}")
         bowling_players_data = match_data.get('bowling_players', [])
-        print(f"DEBUG PDF: bowling_players from match_data: {len(bowling_players_data)} players")
-        
-        for bp in bowling_players_data:
-            print(f"  - {bp.get('name', 'Unknown')}: overs={bp.get('bowling_overs', 0)}, runs={bp.get('bowling_runs', 0)}, wickets={bp.get('bowling_wickets', 0)}")
-        
-        for player in players:
-            bowling_stats = getattr(player, 'bowling_stats', None)
-            if bowling_stats:
-                balls = getattr(bowling_stats, 'balls', 0)
-                runs = getattr(bowling_stats, 'runs', 0)
-                wickets = getattr(bowling_stats, 'wickets', 0)
-                economy = getattr(bowling_stats, 'economy', 0)
-                print(f"  - {getattr(player, 'name', 'Unknown')}: balls={balls}, runs={runs}, wickets={wickets}")
         
         # Prepare bowling data (use bowling_players from match_data if available, fallback to player stats)
         bowling_data = [["Bowler", "Overs", "Runs", "Wickets", "Economy"]]
@@ -399,14 +480,14 @@ class CricketScoreboardPDF:
             for player in players:
                 bowling_stats = getattr(player, 'bowling_stats', None)
                 if bowling_stats:
-                    balls = getattr(bowling_stats, 'balls', 0)
+                    balls = getattr(bowling_stats, 'balls', 0)  # legal deliveries
                     runs = getattr(bowling_stats, 'runs', 0)
                     wickets = getattr(bowling_stats, 'wickets', 0)
                     economy = getattr(bowling_stats, 'economy', 0)
                     
                     bowling_data.append([
                         getattr(player, 'name', 'Unknown'),
-                        f"{balls/6:.1f}" if balls > 0 else "0.0",
+                        f"{balls // 6}.{balls % 6}",
                         str(runs),
                         str(wickets),
                         f"{economy:.2f}" if economy > 0 else "0.00"
@@ -455,6 +536,63 @@ def generate_scoreboard_pdf(match_data, output_path=None):
     return generator.generate_scoreboard_pdf(match_data, output_path)
 
 
+def generate_scoreboard_pdf_bytes(match_data):
+    """Convenience function to generate PDF bytes in memory"""
+    return CricketScoreboardPDF().generate_scoreboard_pdf_bytes(match_data)
+
+
+def generate_booklet_pdf(matches, output_path, title="Tournament Booklet"):
+    """Convenience function to generate a multi-match booklet PDF"""
+    return CricketScoreboardPDF().generate_booklet_pdf(matches, output_path, title)
+
+
+class PDFCache:
+    """Size-bounded LRU cache of rendered PDFs keyed by (match_id, match version)
+    
+    Filled by pdf_jobs.PDFJobQueue, which also makes concurrent requests
+    for a version share one build.
+    """
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return cached PDF bytes for key, or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return data
+    
+    def put(self, key, data):
+        """Store PDF bytes, evicting least recently used entries beyond max_bytes"""
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+    
+    def count_miss(self):
+        """Record a request that had to render its PDF (get() counts the hits)"""
+        with self._lock:
+            self.misses += 1
+
+
+# Process-wide cache used by the web routes
+pdf_cache = PDFCache()
+
+
 if __name__ == "__main__":
     # Test the PDF generator
     from models import MatchState, Team, Player, PlayerRole, BattingStats, BowlingStats
@@ -476,14 +614,12 @@ if __name__ == "__main__":
     player1.batting_stats.balls = 32
     player1.batting_stats.fours = 5
     player1.batting_stats.sixes = 2
-    player1.batting_stats.update_strike_rate()
     
     player2 = Player(id="2", name="Player 2", role=PlayerRole.BOWLER)
     player2.bowling_stats = BowlingStats()
-    player2.bowling_stats.overs = 3.5
+    player2.bowling_stats.overs = 3.5  # stored as 23 balls
     player2.bowling_stats.runs = 28
     player2.bowling_stats.wickets = 2
-    player2.bowling_stats.update_economy()
     
     match.team_a.add_player(player1)
     match.team_a.add_player(player2)
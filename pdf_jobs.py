@@ -0,0 +1,168 @@
+"""
+Background PDF export jobs for the Cricket Scoring Application
+ReportLab builds run in a pool of worker processes, so an export never
+holds a request thread or competes with scoring for the GIL. Jobs are
+keyed by (match_id, version): asking again for a version that is already
+queued or built returns the same job. The number of unfinished jobs is
+bounded; submit() refuses new work when the queue is full.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import tracing
+
+# Worker processes; each holds its own ReportLab import and styles
+DEFAULT_WORKERS = 2
+# Unfinished jobs allowed before submit() pushes back
+DEFAULT_MAX_PENDING = 32
+# Finished jobs remembered for polling and fetching
+DEFAULT_KEEP_FINISHED = 256
+
+
+class QueueFullError(Exception):
+    """Raised when too many exports are already waiting"""
+
+    def __init__(self, pending: int):
+        super().__init__(f"PDF export queue is full ({pending} jobs pending)")
+        self.pending = pending
+
+
+def render_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    """Worker entry point: rebuild the match from its snapshot and render it"""
+    # Imported here so ReportLab is only loaded in the worker processes
+    from models import MatchState
+    from pdf_generator import generate_scoreboard_pdf_bytes
+    match = MatchState.from_snapshot(snapshot)
+    return generate_scoreboard_pdf_bytes({'match': match, 'match_name': match.match_name or 'Cricket Match'})
+
+
+@dataclass
+class PDFJob:
+    job_id: str
+    match_id: str
+    version: int
+    submitted_at: float
+    future: Future = field(repr=False, compare=False)
+    finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def result(self) -> bytes:
+        """PDF bytes of a finished job (raises the worker's error if it failed)"""
+        return self.future.result(timeout=0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'job_id': self.job_id,
+            'match_id': self.match_id,
+            'version': self.version,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at
+        }
+        if data['status'] == 'failed':
+            data['error'] = str(self.future.exception())
+        return data
+
+
+class PDFJobQueue:
+    """Process-pool export queue with per-version de-duplication and a bounded backlog"""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 keep_finished: int = DEFAULT_KEEP_FINISHED, cache=None, render=render_snapshot):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.cache = cache  # optional PDFCache that finished PDFs are added to
+        self.render = render
+        self._executor = None  # ProcessPoolExecutor, created on first use
+        self._jobs: Dict[str, PDFJob] = {}
+        self._by_key: Dict[Tuple[str, int], str] = {}
+        self._finished: OrderedDict = OrderedDict()  # job_id -> None, oldest first
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _pool(self):
+        # Started (and multiprocessing imported) on first use, so importing the app stays cheap
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, match_id: str, snapshot: Dict[str, Any]) -> PDFJob:
+        """Queue an export of snapshot, or return the job already covering that version"""
+        key = (match_id, snapshot['version'])
+        with self._lock:
+            job_id = self._by_key.get(key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                if job.status != 'failed':
+                    return job
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is None and self._pending >= self.max_pending:
+                raise QueueFullError(self._pending)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+            else:
+                future = self._pool().submit(self.render, snapshot)
+                self._pending += 1
+                if self.cache is not None:
+                    self.cache.count_miss()
+            job = PDFJob(str(uuid.uuid4()), match_id, key[1], time.time(), future)
+            self._jobs[job.job_id] = job
+            self._by_key[key] = job.job_id
+        future.add_done_callback(lambda _, job=job, counted=cached is None: self._finish(job, counted))
+        return job
+
+    def _finish(self, job: PDFJob, counted: bool):
+        job.finished_at = time.time()
+        if counted:
+            # Queue wait plus render; the ReportLab phases are timed inside the workers
+            tracing.observe('pdf.job', (job.finished_at - job.submitted_at) * 1000)
+        if self.cache is not None and job.status == 'done':
+            self.cache.put((job.match_id, job.version), job.result())
+        with self._lock:
+            if counted:
+                self._pending -= 1
+            self._finished[job.job_id] = None
+            while len(self._finished) > self.keep_finished:
+                old_id, _ = self._finished.popitem(last=False)
+                old = self._jobs.pop(old_id)
+                if self._by_key.get((old.match_id, old.version)) == old_id:
+                    del self._by_key[(old.match_id, old.version)]
+
+    def get(self, job_id: str) -> Optional[PDFJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def wait_async(self, job_id: str, timeout: Optional[float] = None) -> Optional[PDFJob]:
+        """Wait until the job finishes or timeout passes; returns the job either way"""
+        job = self.get(job_id)
+        if job is not None and not job.future.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+            except Exception:
+                # Timed out, or the job failed; either way the caller reads job.status
+                pass
+        return job
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
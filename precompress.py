@@ -0,0 +1,57 @@
+"""
+Static asset precompression for the Cricket Scoring Application
+Writes a gzip copy (NAME.gz) next to every text asset in static/, so the
+app can send the compressed bytes as they are instead of compressing the
+HTML/CSS/JS bundle on each request. Run it after changing static files
+and commit the .gz copies (tests/test_startup.py checks they are current);
+copies that are already up to date are left alone.
+
+Usage: python precompress.py [DIRECTORY]
+"""
+
+import gzip
+import os
+from typing import List
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# Extensions worth compressing (images are already compressed)
+COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.svg', '.txt')
+
+
+def is_fresh(path: str, compressed_path: str) -> bool:
+    """True if compressed_path exists and is at least as new as path"""
+    return os.path.isfile(compressed_path) and os.path.getmtime(compressed_path) >= os.path.getmtime(path)
+
+
+def precompress(directory: str = STATIC_DIR) -> List[str]:
+    """Write NAME.gz for every compressible file under directory; returns the files written"""
+    written = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            target = path + '.gz'
+            if is_fresh(path, target):
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            # mtime=0 keeps the output identical between builds
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            with open(target, 'wb') as f:
+                f.write(compressed)
+            written.append(target)
+    return written
+
+
+def main():
+    import sys
+    directory = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    for path in precompress(directory):
+        print(f"{os.path.relpath(path)}: {os.path.getsize(path[:-3])} -> {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Deterministic match replay for the Cricket Scoring Application
+Rebuilds a MatchState from its roster and per-innings ball logs by
+re-scoring every delivery through MatchState.score_ball, so the replayed
+stats come from the same rules as live scoring. Checkpoints are taken
+every CHECKPOINT_EVERY balls; the state after any ball (or at the start
+of any over) is restored from the nearest earlier checkpoint, costing
+O(balls since checkpoint) rather than O(match).
+
+Usage: python replay.py [MATCH_ID ...] [--db PATH]
+(verifies every stored match when no IDs are given)
+"""
+
+from bisect import bisect_right
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import MatchState, Team, BallEvent, BallEventLog
+
+# Balls between checkpoints
+CHECKPOINT_EVERY = 30
+
+
+def _fresh_team(team: Optional[Team]) -> Optional[Team]:
+    """The same squad with zeroed stats and no batting/bowling order"""
+    if team is None:
+        return None
+    record = team.to_record()
+    for player in record['players']:
+        player['batting_stats'] = {}
+        player['bowling_stats'] = {}
+    record['batting_order'] = []
+    record['bowling_order'] = []
+    return Team.from_record(record)
+
+
+class MatchReplay:
+    """Replays a match's ball logs from the start, with checkpoints for random access"""
+
+    def __init__(self, match: MatchState, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.checkpoint_every = checkpoint_every
+        self.max_overs = match.max_overs
+        self.match_name = match.match_name
+        self.batting_first_team_name = match.batting_first_team_name
+        self.team_a = match.team_a.to_record() if match.team_a else None
+        self.team_b = match.team_b.to_record() if match.team_b else None
+        # Innings number -> immutable ball log
+        self.logs: Dict[int, BallEventLog] = dict(match.innings_events)
+        self.logs[match.current_innings] = BallEventLog(match.events)
+        # Openers of each team (the first two in its batting order)
+        self.openers = {
+            key: list(team.batting_order[:2])
+            for key, team in (('a', match.team_a), ('b', match.team_b)) if team
+        }
+        # Innings -> sorted ball indexes and the snapshots taken there
+        self._checkpoint_index: Dict[int, List[int]] = {}
+        self._checkpoints: Dict[int, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], **options: Any) -> 'MatchReplay':
+        return cls(MatchState.from_snapshot(snapshot), **options)
+
+    @property
+    def innings(self) -> List[int]:
+        return sorted(self.logs)
+
+    def _initial_state(self) -> MatchState:
+        match = MatchState(
+            team_a=_fresh_team(Team.from_record(self.team_a)) if self.team_a else None,
+            team_b=_fresh_team(Team.from_record(self.team_b)) if self.team_b else None,
+            max_overs=self.max_overs,
+            batting_first_team_name=self.batting_first_team_name,
+            match_name=self.match_name
+        )
+        if match.team_a and match.team_b:
+            first = match.team_a if match.team_a.team_name == self.batting_first_team_name else match.team_b
+            match.batting_team = first
+            match.bowling_team = match.team_b if first is match.team_a else match.team_a
+        return match
+
+    def _start_innings(self, match: MatchState, innings: int):
+        """Bring the match to the first ball of innings (switching innings if needed)"""
+        while match.current_innings < innings:
+            match.switch_innings()
+        log = self.logs.get(innings)
+        openers = self.openers.get(match.team_key(match.batting_team), [])
+        if not log or len(openers) < 2:
+            return
+        striker, non_striker = openers
+        if log[0].batsman_id == non_striker:
+            striker, non_striker = non_striker, striker
+        match.set_openers(striker, non_striker, log[0].bowler_id)
+
+    def _bowl(self, match: MatchState, event: BallEvent):
+        """Re-score one logged delivery, first putting its batsman on strike and its bowler on"""
+        if match.striker is None or match.striker.id != event.batsman_id:
+            if match.non_striker is not None and match.non_striker.id == event.batsman_id:
+                match.striker, match.non_striker = match.non_striker, match.striker
+            else:
+                match.striker = match.find_player(match.batting_team, event.batsman_id)
+                if event.batsman_id not in match.batting_team.batting_order:
+                    match.batting_team.batting_order.append(event.batsman_id)
+        if match.current_bowler is None or match.current_bowler.id != event.bowler_id:
+            match.set_bowler(event.bowler_id)
+        match.score_ball(event.runs, event.extra_type, event.wicket_type, event.catcher_id,
+                         event.runout_by, event.comment)
+
+    def _checkpoint(self, innings: int, balls: int, match: MatchState):
+        index = self._checkpoint_index.setdefault(innings, [])
+        position = bisect_right(index, balls)
+        if position and index[position - 1] == balls:
+            return
+        index.insert(position, balls)
+        self._checkpoints.setdefault(innings, []).insert(position, match.to_snapshot())
+
+    def _restore(self, innings: int, balls: int) -> Tuple[MatchState, int]:
+        """Latest checkpoint at or before ball `balls` of innings, or the start of that innings"""
+        index = self._checkpoint_index.get(innings, [])
+        position = bisect_right(index, balls)
+        if position:
+            return MatchState.from_snapshot(self._checkpoints[innings][position - 1]), index[position - 1]
+        if innings > 1 and innings - 1 in self.logs:
+            match = self.state_at(innings - 1)
+        else:
+            match = self._initial_state()
+        self._start_innings(match, innings)
+        self._checkpoint(innings, 0, match)
+        return match, 0
+
+    def state_at(self, innings: int, balls: Optional[int] = None) -> MatchState:
+        """The match after the first `balls` deliveries of innings (all of them by default)"""
+        log = self.logs.get(innings)
+        if log is None:
+            raise ValueError(f"No ball log for innings {innings}")
+        balls = len(log) if balls is None else max(0, min(balls, len(log)))
+        match, done = self._restore(innings, balls)
+        for position in range(done, balls):
+            self._bowl(match, log[position])
+            if (position + 1) % self.checkpoint_every == 0:
+                self._checkpoint(innings, position + 1, match)
+        match.clear_history()
+        return match
+
+    def state_at_over(self, innings: int, over: int) -> MatchState:
+        """The match at the start of over `over` (0-based) of innings"""
+        log = self.logs.get(innings)
+        if log is None:
+            raise ValueError(f"No ball log for innings {innings}")
+        balls = next((i for i, event in enumerate(log) if event.over_number >= over), len(log))
+        return self.state_at(innings, balls)
+
+    def final_state(self) -> MatchState:
+        return self.state_at(self.innings[-1])
+
+
+def _player_stats(match: MatchState) -> Dict[str, Any]:
+    return {
+        player.id: (asdict(player.batting_stats), asdict(player.bowling_stats))
+        for team in (match.team_a, match.team_b) if team for player in team.players
+    }
+
+
+def verify(match: MatchState) -> List[str]:
+    """Replay match from its ball logs and list every derived value that disagrees (empty if consistent)"""
+    try:
+        replayed = MatchReplay(match).final_state()
+    except (ValueError, KeyError, AttributeError, TypeError) as e:
+        return [f"replay failed: {e}"]
+    problems = []
+    for name in ('current_innings', 'total_runs', 'wickets', 'current_over', 'current_ball', 'first_innings_summary'):
+        expected, actual = getattr(replayed, name), getattr(match, name)
+        if expected != actual:
+            problems.append(f"{name}: stored {actual!r}, replayed {expected!r}")
+    if replayed.tally != match.tally:
+        problems.append("innings tally differs")
+    if replayed.dismissals != match.dismissals:
+        problems.append("dismissals differ")
+    stored_stats, replayed_stats = _player_stats(match), _player_stats(replayed)
+    for player_id, stats in stored_stats.items():
+        if replayed_stats.get(player_id) != stats:
+            problems.append(f"stats of player {player_id} differ: stored {stats}, replayed {replayed_stats.get(player_id)}")
+    return problems
+
+
+def main():
+    import argparse
+    from match_store import SQLiteMatchStore
+    parser = argparse.ArgumentParser(description='Verify stored matches by replaying their ball logs')
+    parser.add_argument('match_ids', nargs='*')
+    parser.add_argument('--db', help='SQLite store path (default: CRICSMART_DB_PATH or the temp dir)')
+    args = parser.parse_args()
+
+    store = SQLiteMatchStore(args.db)
+    failures = 0
+    for match_id in args.match_ids or store.list_match_ids():
+        match = store.load(match_id)
+        if match is None:
+            print(f"{match_id}: not found")
+            failures += 1
+            continue
+        problems = verify(match)
+        failures += bool(problems)
+        print(f"{match_id}: {'OK' if not problems else 'MISMATCH'}")
+        for problem in problems:
+            print(f"  - {problem}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Serverless cold start checks
+The entry point imports within benchmarks/bench_import_time.py's budget
+without loading the on-demand modules, and the committed gzip copies of
+the static assets match their sources.
+"""
+
+import gzip
+import os
+import subprocess
+import sys
+
+from precompress import COMPRESSIBLE, STATIC_DIR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_entry_point_import_budget():
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', 'bench_import_time.py')],
+                            cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_precompressed_assets_are_current():
+    sources = [name for name in os.listdir(STATIC_DIR) if name.endswith(COMPRESSIBLE)]
+    assert sources
+    for name in sources:
+        path = os.path.join(STATIC_DIR, name)
+        # Run `python precompress.py` and commit the .gz files after changing static/
+        assert os.path.isfile(path + '.gz'), f"{name}.gz is missing"
+        with open(path, 'rb') as f, gzip.open(path + '.gz', 'rb') as compressed:
+            assert compressed.read() == f.read(), f"{name}.gz is out of date"
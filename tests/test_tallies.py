@@ -0,0 +1,113 @@
+"""
+Running innings tallies against a full rebuild from the ball log
+Scores seeded random matches with undo, redo and innings switches mixed in
+and checks after every command that MatchState.tally matches
+InningsTally.from_events over the current innings' events.
+"""
+
+import random
+
+import pytest
+
+from models import MatchState, Team, Player, PlayerRole, WicketType, BallEvent, InningsTally
+from match_store import MemoryMatchStore
+
+SQUAD = 6
+OVERS = 4
+
+
+def new_match() -> MatchState:
+    match = MatchState(team_a=Team("A"), team_b=Team("B"), max_overs=OVERS, match_name="A vs B")
+    for team in (match.team_a, match.team_b):
+        for i in range(SQUAD):
+            team.add_player(Player(id=f"{team.team_name}{i}", name=f"{team.team_name} {i}", role=PlayerRole.ALL_ROUNDER))
+    match.batting_team, match.bowling_team = match.team_a, match.team_b
+    match.batting_first_team_name = "A"
+    open_innings(match)
+    return match
+
+
+def open_innings(match: MatchState):
+    batting, bowling = match.batting_team.players, match.bowling_team.players
+    match.set_openers(batting[0].id, batting[1].id, bowling[0].id)
+
+
+def bowl(match: MatchState, rng: random.Random) -> BallEvent:
+    extra_type = rng.choice([None] * 8 + ["wide", "no-ball", "bye", "leg-bye", "dead-ball"])
+    wicket_type = None
+    if extra_type is None and rng.random() < 0.08:
+        wicket_type = rng.choice([WicketType.BOWLED, WicketType.CAUGHT, WicketType.RUN_OUT])
+    event = match.score_ball(rng.choice([0, 0, 1, 1, 2, 3, 4, 6]), extra_type, wicket_type)
+    if match.current_ball == 0 and match.striker is not None and not match.is_innings_complete():
+        bowlers = match.bowling_team.players
+        match.set_bowler(bowlers[match.current_over % len(bowlers)].id)
+    return event
+
+
+def step(match: MatchState, rng: random.Random):
+    """One random scoring command (a ball, an undo, a redo or an innings switch) as (log op, result)"""
+    roll = rng.random()
+    if roll < 0.2:
+        return 'undo', match.undo()
+    if roll < 0.3:
+        return 'redo', match.redo()
+    if match.striker is None or match.is_innings_complete():
+        if match.current_innings == 1:
+            match.switch_innings()
+            open_innings(match)
+            return None, None
+        return 'ball', None
+    return 'ball', bowl(match, rng)
+
+
+def assert_tallies(match: MatchState):
+    assert match.verify_tallies()
+    rebuilt = InningsTally.from_events(list(match.events))
+    assert rebuilt == match.tally
+    assert rebuilt.runs == match.total_runs
+    assert rebuilt.wickets == match.wickets
+    assert rebuilt.legal_balls == match.current_over * 6 + match.current_ball
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_tallies_match_rebuild(seed):
+    rng = random.Random(seed)
+    match = new_match()
+    for _ in range(300):
+        step(match, rng)
+        assert_tallies(match)
+    for innings, events in match.innings_events.items():
+        assert InningsTally.from_events(events).runs == match.first_innings_summary['runs']
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_tallies_after_reload(seed):
+    """Tallies stay right when scoring continues on a match recovered from the store"""
+    rng = random.Random(seed)
+    store = MemoryMatchStore(snapshot_every=5)
+    match = new_match()
+    store.save('match', match)
+    for _ in range(200):
+        # Persisted the way MatchRegistry commits a command
+        op, result = step(match, rng)
+        if isinstance(result, BallEvent):
+            store.record('match', match, op, result)
+        elif op is None or result is not None:
+            store.save('match', match)
+        if rng.random() < 0.2:
+            match = store.load('match')
+        assert_tallies(match)
+
+
+def test_undo_to_start_and_redo_to_end():
+    rng = random.Random(42)
+    match = new_match()
+    while match.striker is not None and not match.is_innings_complete():
+        bowl(match, rng)
+    final = match.tally
+    while match.undo() is not None:
+        assert_tallies(match)
+    assert match.tally == InningsTally()
+    while match.redo() is not None:
+        assert_tallies(match)
+    assert match.tally == final
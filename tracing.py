@@ -0,0 +1,124 @@
+"""
+Lightweight timing spans and latency histograms
+Enable with CRICSMART_TRACING=1 (or tracing.enable()). When disabled,
+span() returns a shared no-op context manager, so instrumented code pays
+for one function call and a flag check.
+
+    with tracing.span('state.build'):
+        ...
+
+Each span name gets a fixed-bucket latency histogram; snapshot() reports
+them for the /api/metrics route.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Any, Dict, Optional
+
+# Upper bounds of the histogram buckets, in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_enabled = os.environ.get('CRICSMART_TRACING', '').lower() in ('1', 'true', 'yes', 'on')
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Latency histogram with fixed millisecond buckets"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max_ms for the open bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(BUCKETS_MS, self.counts)}
+        buckets['inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': buckets
+        }
+
+
+_histograms: Dict[str, Histogram] = {}
+_lock = threading.Lock()
+
+
+def observe(name: str, ms: float):
+    """Record a duration measured elsewhere (no-op when tracing is disabled)"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(ms)
+
+
+class Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def span(name: str):
+    """Context manager timing the enclosed block under name"""
+    if not _enabled:
+        return _NOOP
+    return Span(name)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Histogram summaries by span name"""
+    with _lock:
+        return {name: histogram.to_dict() for name, histogram in sorted(_histograms.items())}